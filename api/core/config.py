@@ -20,6 +20,72 @@ class Settings(BaseSettings):
     ALERTS_COLLECTION_NAME: str = "Event"
     GRIDFS_BUCKET_NAME: str = "Photo_storage"
 
+    # --- Derived State ---
+    # How often the event follower polls for new alerts, and how often it rebuilds
+    # every in-memory view from scratch to pick up deletes or missed writes.
+    EVENT_POLL_INTERVAL_SECONDS: float = 5.0
+    EVENT_RESYNC_INTERVAL_SECONDS: float = 3600.0
+    # Maximum age of the in-memory KPI counters served by /stats before a request polls inline.
+    STATS_MAX_STALENESS_SECONDS: float = 10.0
+    # Materialized per-person summaries backing the people endpoints, and how often
+    # new alerts are folded into them.
+    PERSON_SUMMARY_COLLECTION_NAME: str = "person_summary"
+    PERSON_SUMMARY_REFRESH_SECONDS: float = 10.0
+
+    # --- Response Caching ---
+    # How long identical /stats, /people and /cameras requests reuse a computed result (0 disables reuse).
+    RESULT_CACHE_TTL_SECONDS: float = 2.0
+    # Validate and encode list responses in one pydantic-core pass instead of per row.
+    FAST_JSON_RESPONSES: bool = True
+
+    # --- Export ---
+    # Alerts fetched per cursor batch (and written per chunk) by /alerts/export.
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # --- Live Alert Stream ---
+    # Alerts buffered per SSE client before a slow client is disconnected to resume later.
+    ALERT_STREAM_QUEUE_SIZE: int = 1000
+    # Interval between keep-alive comments on an idle stream.
+    ALERT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    # Most alerts replayed from the database when a client resumes with Last-Event-ID.
+    ALERT_STREAM_REPLAY_LIMIT: int = 1000
+
+    # --- Thumbnails ---
+    # Where thumbnails are rendered: "thread" or "process" pool, and its size.
+    THUMBNAIL_EXECUTOR: str = "thread"
+    THUMBNAIL_WORKERS: int = 4
+    # How often to render thumbnails for newly uploaded images ahead of demand (0 disables).
+    THUMBNAIL_PREWARM_INTERVAL_SECONDS: float = 30.0
+    # Memory budget for the in-process thumbnail byte cache.
+    THUMBNAIL_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Memory budget for rendered person/camera contact sheets.
+    CONTACT_SHEET_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # Memory budget for resized preview derivatives (WebP/AVIF/JPEG at several sizes).
+    DERIVATIVE_CACHE_MAX_BYTES: int = 128 * 1024 * 1024
+
+    # --- Image Index ---
+    # Most image_id -> GridFS file/thumbnail mappings kept in memory, and how often
+    # newly uploaded files and thumbnails are folded in (0 disables polling).
+    IMAGE_INDEX_MAX_ENTRIES: int = 50_000
+    IMAGE_INDEX_REFRESH_SECONDS: float = 30.0
+
+    # --- Image Disk Cache ---
+    # Local directory holding copies of GridFS originals, thumbnails and derivatives,
+    # so repeat reads skip the database (empty disables the disk tier), and its size cap.
+    IMAGE_DISK_CACHE_DIR: str = ""
+    IMAGE_DISK_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+
+    # --- Diagnostics ---
+    # Explain the routers' query shapes on startup and log any that scan or sort in memory.
+    QUERY_PLAN_REPORT: bool = False
+    # Log MongoDB read commands slower than this many milliseconds (0 disables the log).
+    MONGO_SLOW_QUERY_MS: float = 500.0
+    # Allow `?explain=true` / `X-Explain: 1` on read endpoints to return query plans
+    # and execution stats instead of data. Explains execute the query, so keep it off in production.
+    EXPLAIN_ENABLED: bool = False
+    # Allow `DELETE /images/debug/cache` to empty the image caches, for cold-cache benchmarks.
+    IMAGE_CACHE_CLEAR_ENABLED: bool = False
+
     # Pydantic settings configuration
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from threading import Lock
+from typing import NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+from api.core.config import settings
+
+class DiskEntry(NamedTuple):
+    path: str
+    meta: dict
+
+class DiskCacheWriter:
+    """
+    Streams one blob into a temporary file; `commit` publishes it under its key,
+    `abort` throws the partial copy away.
+    """
+    def __init__(self, cache: "DiskCache", digest: str, meta: dict):
+        self._cache = cache
+        self._digest = digest
+        self._meta = meta
+        fd, self._tmp_path = tempfile.mkstemp(dir=cache.directory, prefix=".")
+        self._file = os.fdopen(fd, "wb")
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)
+        self.size += len(data)
+
+    def commit(self) -> None:
+        self._file.close()
+        self._cache._commit(self._digest, self._tmp_path, self.size, self._meta)
+
+    def abort(self) -> None:
+        self._file.close()
+        _unlink(self._tmp_path)
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+class DiskCache:
+    """
+    A size-bounded directory of immutable blobs, evicted least recently used first.
+    Blobs are named by a hash of their key, so a key always maps to the same file
+    and nothing ever needs invalidating. Each blob has a JSON sidecar holding the
+    metadata needed to serve it without asking the database.
+    Recency is tracked in memory and seeded from file access times on startup.
+    Methods do blocking file I/O; call them from a worker thread.
+    """
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # digest -> (size, meta)
+        self._entries: "OrderedDict[str, Tuple[int, dict]]" = OrderedDict()
+        self._lock = Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def _load(self) -> None:
+        """Index the blobs left by a previous run, dropping temporaries and orphans."""
+        found = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                if name.startswith("."):
+                    _unlink(path)
+                    continue
+                if name.endswith(".json"):
+                    continue
+                try:
+                    with open(path + ".json") as f:
+                        meta = json.load(f)
+                    stat = os.stat(path)
+                except (OSError, ValueError):
+                    _unlink(path)
+                    _unlink(path + ".json")
+                    continue
+                found.append((stat.st_atime, name, stat.st_size, meta))
+        for _, digest, size, meta in sorted(found):
+            self._entries[digest] = (size, meta)
+            self.current_bytes += size
+        with self._lock:
+            self._evict()
+        if found:
+            logger.info(f"Image disk cache holds {len(self._entries)} file(s), {self.current_bytes} bytes.")
+
+    def get(self, key: str) -> Optional[DiskEntry]:
+        """The cached file for `key` and its metadata, or None."""
+        digest = self._digest(key)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+        return DiskEntry(self._path(digest), entry[1])
+
+    def read(self, key: str) -> Optional[bytes]:
+        """The cached bytes for `key`, or None."""
+        entry = self.get(key)
+        if entry is None:
+            return None
+        try:
+            with open(entry.path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            # Removed behind our back; forget it
+            self._discard(self._digest(key))
+            return None
+
+    def writer(self, key: str, meta: dict) -> DiskCacheWriter:
+        """Start streaming a blob for `key` into the cache."""
+        return DiskCacheWriter(self, self._digest(key), meta)
+
+    def put(self, key: str, data: bytes, meta: dict) -> None:
+        writer = self.writer(key, meta)
+        writer.write(data)
+        writer.commit()
+
+    def _commit(self, digest: str, tmp_path: str, size: int, meta: dict) -> None:
+        if size > self.max_bytes:
+            # Never let one oversized file flush the whole cache
+            _unlink(tmp_path)
+            return
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".json", "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+        with self._lock:
+            previous = self._entries.pop(digest, None)
+            if previous is not None:
+                self.current_bytes -= previous[0]
+            self._entries[digest] = (size, meta)
+            self.current_bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        while self.current_bytes > self.max_bytes and self._entries:
+            digest, (size, _) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+            path = self._path(digest)
+            _unlink(path)
+            _unlink(path + ".json")
+
+    def clear(self) -> None:
+        """Delete every cached blob."""
+        with self._lock:
+            digests = list(self._entries)
+            self._entries.clear()
+            self.current_bytes = 0
+        for digest in digests:
+            path = self._path(digest)
+            _unlink(path)
+            _unlink(path + ".json")
+
+    def _discard(self, digest: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(digest, None)
+            if entry is not None:
+                self.current_bytes -= entry[0]
+
+    def stats(self) -> dict:
+        return {
+            "directory": self.directory,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+# This object will be imported and used by other parts of the application.
+# None when IMAGE_DISK_CACHE_DIR is unset, which turns the disk tier off.
+image_disk_cache: Optional[DiskCache] = (
+    DiskCache(settings.IMAGE_DISK_CACHE_DIR, settings.IMAGE_DISK_CACHE_MAX_BYTES)
+    if settings.IMAGE_DISK_CACHE_DIR else None
+)
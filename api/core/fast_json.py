@@ -0,0 +1,17 @@
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+def json_response(adapter: TypeAdapter, content: Any, response: Optional[Response] = None) -> Response:
+    """
+    Validate `content` with a single TypeAdapter call and encode it straight to
+    JSON bytes in pydantic-core, instead of building a model per row and then
+    serializing each one again. Headers set on the endpoint's injected
+    `response` (e.g. `X-Next-Cursor`) are carried over.
+    """
+    body = adapter.dump_json(adapter.validate_python(content), by_alias=True)
+    fast = Response(content=body, media_type="application/json")
+    if response is not None:
+        fast.headers.raw.extend(response.headers.raw)
+    return fast
@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import Response
+
+# Content addressed by an immutable id can be cached by browsers forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def etag_matches(if_none_match: Optional[str], etag: str, allow_wildcard: bool = True) -> bool:
+    """
+    Check an `If-None-Match` header against a strong ETag.
+    Uses weak comparison, as RFC 9110 requires for If-None-Match.
+    `*` matches any existing representation, so pass `allow_wildcard=False`
+    when checking before the resource is known to exist.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return allow_wildcard
+    bare = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == bare:
+            return True
+    return False
+
+def not_modified(etag: str, cache_control: str = IMMUTABLE_CACHE_CONTROL,
+                 last_modified: Optional[str] = None) -> Response:
+    """A bodiless 304 response carrying the validator headers."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return Response(status_code=304, headers=headers)
+
+class RangeNotSatisfiable(ValueError):
+    """The requested byte range lies outside the resource."""
+
+def parse_range(range_header: Optional[str], length: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range `Range: bytes=...` header into an inclusive (start, end) pair.
+    Returns None when the header is absent, malformed or asks for several ranges,
+    in which case the whole resource should be sent.
+    Raises RangeNotSatisfiable if the range starts past the end of the resource.
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            # Suffix range: the last N bytes
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(range_header)
+            return max(0, length - suffix), length - 1
+        start = int(first)
+        end = int(last) if last else length - 1
+    except ValueError:
+        return None
+    if start >= length:
+        raise RangeNotSatisfiable(range_header)
+    if end < start:
+        return None
+    return start, min(end, length - 1)
+
+def http_date(value: datetime) -> str:
+    """Format a naive-UTC or aware datetime as an HTTP date."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def modified_since(if_modified_since: Optional[str], last_modified: datetime) -> bool:
+    """
+    True unless `If-Modified-Since` is a valid date at or after `last_modified`.
+    HTTP dates have one-second resolution, so sub-second parts are ignored.
+    """
+    if not if_modified_since:
+        return True
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return True
+    if since is None:
+        return True
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) > since
@@ -0,0 +1,161 @@
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Minimal Prometheus metrics in the text exposition format.
+# Observations can come from request handlers and from pymongo's monitoring
+# threads, so every metric guards its state with a lock.
+
+class RouteLabel:
+    """
+    Route template of the request being handled, e.g. "/api/v1/people/{person_id}".
+    Set by the metrics middleware and filled in once the route is matched.
+    """
+    __slots__ = ("route",)
+
+    def __init__(self, route: str = "unmatched"):
+        self.route = route
+
+# Motor copies context into its executor threads, so command listeners see it too
+current_route: ContextVar[Optional[RouteLabel]] = ContextVar("current_route", default=None)
+
+def route_label() -> str:
+    """The current request's route template, or "background" outside a request."""
+    label = current_route.get()
+    return label.route if label is not None else "background"
+
+def route_template(scope: dict) -> str:
+    """
+    The matched route's path template, from the route Starlette records in the
+    scope. Unmatched paths share one label so stray 404s can't grow the label
+    set without bound.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    # Routes of an included router may know only their own path; put back the
+    # prefix they were included under, which is whatever precedes that path
+    try:
+        own_path = route.url_path_for(route.name, **(scope.get("path_params") or {}))
+    except Exception:
+        return template
+    path = scope["path"]
+    if own_path and path.endswith(own_path):
+        return path[:len(path) - len(own_path)] + template
+    return template
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Counter:
+    """A monotonically increasing value per label set."""
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+class Histogram:
+    """Observation counts in cumulative buckets, plus their sum, per label set."""
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets + (float("inf"),), series):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    bucket_labels = _labels(self.labelnames, key, 'le="' + le + '"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {_number(cumulative)}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {series[-1]!r}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_number(cumulative)}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: list = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# This object will be imported and used by other parts of the application
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(Histogram(
+    "dfip_http_request_duration_seconds",
+    "Time to produce a response (headers, for streams), by route template.",
+    ("method", "route", "status"),
+))
+mongo_command_duration = registry.register(Histogram(
+    "dfip_mongo_command_duration_seconds",
+    "MongoDB read command round trips, by command, collection and calling route.",
+    ("command", "collection", "route"),
+))
+mongo_documents_returned = registry.register(Counter(
+    "dfip_mongo_documents_returned_total",
+    "Documents returned by MongoDB read commands.",
+    ("command", "collection", "route"),
+))
+mongo_command_failures = registry.register(Counter(
+    "dfip_mongo_command_failures_total",
+    "MongoDB read commands that failed.",
+    ("command", "collection", "route"),
+))
+mongo_slow_commands = registry.register(Counter(
+    "dfip_mongo_slow_commands_total",
+    "MongoDB read commands slower than MONGO_SLOW_QUERY_MS.",
+    ("command", "collection", "route"),
+))
@@ -0,0 +1,67 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from bson import ObjectId
+
+# Opaque keyset cursors.
+# A cursor encodes the sort key of the last document on a page, so the next page
+# can be fetched with a range predicate instead of an O(skip) `.skip()`.
+
+def encode_cursor(sort_value: Any, doc_id: Any) -> str:
+    """
+    Encode a (sort value, _id) pair into an opaque, URL-safe cursor string.
+    `_id` is usually an ObjectId, but grouped results may use plain values.
+    """
+    if isinstance(sort_value, datetime):
+        payload = {"t": sort_value.isoformat()}
+    else:
+        payload = {"v": sort_value}
+    if isinstance(doc_id, ObjectId):
+        payload["id"] = str(doc_id)
+    else:
+        payload["k"] = doc_id
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        doc_id = ObjectId(payload["id"]) if "id" in payload else payload["k"]
+        if "t" in payload:
+            return datetime.fromisoformat(payload["t"]), doc_id
+        return payload["v"], doc_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def keyset_filter(field: str, cursor: Optional[str], descending: bool = True) -> dict:
+    """
+    Build the range predicate that selects documents strictly after the cursor
+    for a sort of `[(field, dir), ("_id", dir)]`. Returns an empty dict if no cursor.
+    MongoDB sorts a null or missing `field` below every other value, so those
+    documents come last in a descending sort and first in an ascending one;
+    the predicate pages through them by `_id` in that position.
+    """
+    if not cursor:
+        return {}
+    value, doc_id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    if field == "_id":
+        return {"_id": {op: doc_id}}
+    if value is None:
+        after_nulls = [] if descending else [{field: {"$ne": None}}]
+        return {"$or": [{field: None, "_id": {op: doc_id}}] + after_nulls}
+    branches = [
+        {field: {op: value}},
+        {field: value, "_id": {op: doc_id}},
+    ]
+    if descending:
+        # Range operators never match null, but nulls still follow in a descending sort
+        branches.append({field: None})
+    return {"$or": branches}
@@ -0,0 +1,67 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Tuple
+
+from api.core.config import settings
+from api.core.singleflight import SingleFlight
+
+def cache_key(name: str, **params: Any) -> Tuple:
+    """
+    Normalize an endpoint name and its query parameters into a cache key.
+    Parameters left at None are dropped and the rest are sorted by name, so
+    equivalent requests share a key regardless of argument order.
+    """
+    return (name,) + tuple(sorted((k, v) for k, v in params.items() if v is not None))
+
+class ResultCache:
+    """
+    Short-TTL cache of endpoint results in front of a single-flight.
+    Identical requests arriving together share one computation; identical
+    requests within `ttl` seconds of it reuse its result. A `ttl` of 0 keeps
+    the coalescing but caches nothing.
+
+    Cached values are shared between requests and must not be mutated.
+    """
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_compute(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached result for `key`, else compute it once with `fn()`."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+        self.misses += 1
+
+        async def _compute() -> Any:
+            value = await fn()
+            if self.ttl > 0:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return value
+
+        return await self._flight.do(key, _compute)
+
+    def stats(self) -> dict:
+        """Counters for the debug endpoint. `coalesced` misses waited on another request's call."""
+        return {
+            "ttl_seconds": self.ttl,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "computed": self._flight.calls,
+            "coalesced": self._flight.shared,
+        }
+
+# This object will be imported and used by other parts of the application
+result_cache = ResultCache(ttl=settings.RESULT_CACHE_TTL_SECONDS)
@@ -0,0 +1,85 @@
+import threading
+from typing import Dict, Tuple
+
+from loguru import logger
+from pymongo import monitoring
+
+from api.core.config import settings
+from api.core.metrics import (
+    mongo_command_duration,
+    mongo_command_failures,
+    mongo_documents_returned,
+    mongo_slow_commands,
+    route_label,
+)
+
+# Commands worth timing; handshakes, pings and session bookkeeping are ignored
+MONITORED_COMMANDS = {"find", "aggregate", "getMore", "count", "distinct"}
+
+def _collection(command_name: str, command: dict) -> str:
+    if command_name == "getMore":
+        return str(command.get("collection", ""))
+    value = command.get(command_name)
+    return value if isinstance(value, str) else ""
+
+def _documents_returned(reply: dict) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    if "values" in reply:
+        return len(reply["values"])
+    return 1 if "n" in reply else 0
+
+def _describe(command_name: str, command: dict) -> str:
+    """The filter or pipeline of a command, for the slow-query log."""
+    for key in ("filter", "pipeline", "query"):
+        if key in command:
+            return f"{key}={command[key]!r}"[:1000]
+    return command_name
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    Records the duration and returned document count of every read command,
+    labelled with the route that issued it, and logs commands slower than
+    MONGO_SLOW_QUERY_MS. Started events are matched to their outcome by
+    (connection, request id).
+    """
+    def __init__(self, slow_query_ms: float):
+        self.slow_query_ms = slow_query_ms
+        self._pending: Dict[Tuple, Tuple[str, str, str, str]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name not in MONITORED_COMMANDS:
+            return
+        description = _describe(event.command_name, event.command) if self.slow_query_ms > 0 else ""
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                event.command_name, _collection(event.command_name, event.command), route_label(), description
+            )
+
+    def _finish(self, event):
+        with self._lock:
+            return self._pending.pop((event.connection_id, event.request_id), None)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pending = self._finish(event)
+        if pending is None:
+            return
+        command, collection, route, description = pending
+        seconds = event.duration_micros / 1_000_000
+        mongo_command_duration.observe(seconds, command=command, collection=collection, route=route)
+        mongo_documents_returned.inc(_documents_returned(event.reply), command=command, collection=collection, route=route)
+        if self.slow_query_ms > 0 and seconds * 1000 >= self.slow_query_ms:
+            mongo_slow_commands.inc(command=command, collection=collection, route=route)
+            logger.warning(f"Slow {command} on {collection} ({seconds * 1000:.0f}ms) from {route}: {description}")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pending = self._finish(event)
+        if pending is None:
+            return
+        command, collection, route, _ = pending
+        mongo_command_failures.inc(command=command, collection=collection, route=route)
+
+# This object will be imported and used by other parts of the application
+command_metrics_listener = CommandMetricsListener(slow_query_ms=settings.MONGO_SLOW_QUERY_MS)
@@ -0,0 +1,152 @@
+from typing import Iterator, List, Optional
+
+from bson import ObjectId
+from fastapi import Header, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api.core.config import settings
+
+def _stages(node) -> Iterator[str]:
+    """Recursively yield every `stage` name found in an explain plan tree."""
+    if isinstance(node, dict):
+        if isinstance(node.get("stage"), str):
+            yield node["stage"]
+        for value in node.values():
+            yield from _stages(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _stages(item)
+
+def _values(node, key: str) -> Iterator:
+    """Yield every value stored under `key` in an explain document, without descending into them."""
+    if isinstance(node, dict):
+        for name, value in node.items():
+            if name == key:
+                yield value
+            else:
+                yield from _values(value, key)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _values(item, key)
+
+def _winning_plans(node) -> Iterator[dict]:
+    """Yield every `winningPlan` in an explain document (aggregations may nest them)."""
+    return _values(node, "winningPlan")
+
+def plan_stages(explain: dict) -> List[str]:
+    """
+    Flatten the winning plan(s) of an explain result into a list of stage names.
+    """
+    stages = []
+    for plan in _winning_plans(explain):
+        stages.extend(_stages(plan))
+    return stages
+
+def plan_indexes(explain: dict) -> List[str]:
+    """
+    Names of the indexes used by the winning plan(s), including those of `$lookup` stages.
+    """
+    names = []
+    for plan in _winning_plans(explain):
+        names.extend(_values(plan, "indexName"))
+    for stage in explain.get("stages") or []:
+        names.extend(stage.get("indexesUsed", []))
+    return list(dict.fromkeys(names))
+
+def execution_summary(explain: dict) -> dict:
+    """
+    Keys examined, documents examined, documents returned and time taken, from an
+    `executionStats` explain. Aggregations report a cursor section plus one entry
+    per `$lookup`, so examined counts are summed across them.
+    """
+    sections = list(_values(explain, "executionStats"))
+    stages = explain.get("stages") or []
+    lookups = [stage for stage in stages if "$lookup" in stage]
+
+    keys_examined = sum(s.get("totalKeysExamined", 0) for s in sections + lookups)
+    docs_examined = sum(s.get("totalDocsExamined", 0) for s in sections + lookups)
+    if stages:
+        n_returned = stages[-1].get("nReturned")
+        millis = stages[-1].get("executionTimeMillisEstimate")
+    else:
+        n_returned = sections[0].get("nReturned") if sections else None
+        millis = sections[0].get("executionTimeMillis") if sections else None
+    return {
+        "n_returned": n_returned,
+        "keys_examined": keys_examined,
+        "docs_examined": docs_examined,
+        "execution_time_ms": millis,
+    }
+
+async def explain_find(collection, query: dict, sort: Optional[list] = None, limit: int = 0,
+                       verbosity: str = "queryPlanner", skip: int = 0) -> dict:
+    """
+    Run `explain` for a find with the given filter, sort, skip and limit.
+    """
+    command = {"find": collection.name, "filter": query}
+    if sort:
+        command["sort"] = dict(sort)
+    if skip:
+        command["skip"] = skip
+    if limit:
+        command["limit"] = limit
+    return await collection.database.command("explain", command, verbosity=verbosity)
+
+async def explain_aggregate(collection, pipeline: list, verbosity: str = "queryPlanner") -> dict:
+    """
+    Run `explain` for an aggregation pipeline.
+    """
+    command = {"aggregate": collection.name, "pipeline": pipeline, "cursor": {}}
+    return await collection.database.command("explain", command, verbosity=verbosity)
+
+# --- Request-level explain mode ---
+
+async def explain_mode(
+    explain: bool = Query(False, description="Return the query plans and execution stats instead of the data (needs EXPLAIN_ENABLED)"),
+    x_explain: Optional[str] = Header(None, alias="X-Explain"),
+) -> bool:
+    """
+    FastAPI dependency: whether the caller asked for an endpoint's query plans
+    instead of its data, with `?explain=true` or an `X-Explain: 1` header.
+    """
+    requested = explain or (x_explain or "").strip().lower() in ("1", "true", "yes")
+    if requested and not settings.EXPLAIN_ENABLED:
+        raise HTTPException(status_code=403, detail="Explain mode is disabled; set EXPLAIN_ENABLED=true to use it.")
+    return requested
+
+def _report(name: str, collection, command: dict, explain: dict) -> dict:
+    return {
+        "name": name,
+        "collection": collection.name,
+        "command": command,
+        "winning_plan": plan_stages(explain),
+        "indexes": plan_indexes(explain),
+        **execution_summary(explain),
+    }
+
+async def explain_find_report(name: str, collection, query: dict, sort: Optional[list] = None,
+                              skip: int = 0, limit: int = 0) -> dict:
+    """
+    Execute a find under `executionStats` and summarize its plan and cost.
+    """
+    explain = await explain_find(collection, query, sort, limit, verbosity="executionStats", skip=skip)
+    command = {"find": query, "sort": dict(sort) if sort else None, "skip": skip, "limit": limit}
+    return _report(name, collection, command, explain)
+
+async def explain_aggregate_report(name: str, collection, pipeline: list) -> dict:
+    """
+    Execute an aggregation under `executionStats` and summarize its plan and cost.
+    """
+    explain = await explain_aggregate(collection, pipeline, verbosity="executionStats")
+    return _report(name, collection, {"aggregate": pipeline}, explain)
+
+def explain_response(queries: List[dict], note: Optional[str] = None) -> JSONResponse:
+    """
+    The explain-mode response body: one report per database query the handler
+    would have run, in order.
+    """
+    content = {"queries": queries}
+    if note:
+        content["note"] = note
+    return JSONResponse(jsonable_encoder(content, custom_encoder={ObjectId: str}))
@@ -2,6 +2,7 @@ from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
 from loguru import logger
 from api.db.mongodb import db
 from api.core.config import settings
+from api.db.command_monitor import command_metrics_listener
 
 async def connect_to_mongo():
     """
@@ -16,7 +17,9 @@ async def connect_to_mongo():
             maxPoolSize=20,
             minPoolSize=10,
             # Set a timeout for server selection to avoid long waits
-            serverSelectionTimeoutMS=5000
+            serverSelectionTimeoutMS=5000,
+            # Per-command latency metrics and the slow-query log
+            event_listeners=[command_metrics_listener],
         )
         # Ping the server to confirm a successful connection
         await db.client.admin.command('ping')
@@ -55,11 +58,17 @@ async def create_indexes():
     """
     logger.info("Ensuring database indexes are created...")
     try:
-        # Indexes for the 'alerts' collection for efficient querying
+        # Indexes for the 'alerts' collection for efficient querying.
+        # Single-field level/camera_id/person_id lookups are served by the prefixes
+        # of the compound indexes below.
         await db.alerts_collection.create_index([("time", -1)])
-        await db.alerts_collection.create_index([("level", 1)])
-        await db.alerts_collection.create_index([("camera_id", 1)])
-        await db.alerts_collection.create_index([("person_id", 1)])
+        # Matches the keyset sort used by the alerts list cursor
+        await db.alerts_collection.create_index([("time", -1), ("_id", -1)])
+
+        # Compound indexes for the equality filters the routers combine with the time sort,
+        # so e.g. `camera_id=X` sorted by time walks one index range with no in-memory SORT
+        for field in ("camera_id", "person_id", "level"):
+            await db.alerts_collection.create_index([(field, 1), ("time", -1), ("_id", -1)])
         
         # Check if image_id index already exists before creating
         existing_indexes = await db.alerts_collection.list_indexes().to_list(length=None)
@@ -82,6 +91,9 @@ async def create_indexes():
         if "metadata.image_id_1" not in gridfs_index_names:
             await fs_files_collection.create_index([("metadata.image_id", 1)], unique=True, sparse=True)
 
+        # Thumbnails are looked up by the original file they were rendered from
+        await db.db[f"{settings.GRIDFS_BUCKET_NAME}_thumbnails.files"].create_index([("metadata.original_id", 1)])
+
         logger.info("Database indexes are in place.")
     except Exception as e:
         logger.error(f"An error occurred while creating indexes: {e}")
@@ -1,12 +1,24 @@
 import os
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from loguru import logger
 
 from api.core.config import settings
+from api.core.metrics import RouteLabel, current_route, http_request_duration, registry, route_template
 from api.db.mongodb_utils import connect_to_mongo, close_mongo_connection
+from api.services.query_plans import report_query_plans
+from api.services.event_follower import event_follower
+from api.services.stats_engine import stats_engine
+from api.services.rollups import time_rollups
+from api.services.camera_stats import camera_stats_view
+from api.services.alert_broadcaster import alert_broadcaster
+from api.services.thumbnails import thumbnail_prewarmer, shutdown_executor
+from api.services.person_summary import person_summary_view
+from api.services.image_index import image_resolver
 from api.routers import alerts, images, stats, people, cameras
 
 @asynccontextmanager
@@ -17,16 +29,39 @@ async def lifespan(app: FastAPI):
     """
     logger.info("Starting up API server...")
     await connect_to_mongo()
+    if settings.QUERY_PLAN_REPORT:
+        await report_query_plans()
+    event_follower.register(stats_engine)
+    event_follower.register(time_rollups)
+    event_follower.register(camera_stats_view)
+    event_follower.register(alert_broadcaster)
+    await event_follower.start()
+    await person_summary_view.start()
+    await image_resolver.start()
+    if settings.THUMBNAIL_PREWARM_INTERVAL_SECONDS > 0:
+        await thumbnail_prewarmer.start()
     yield
     logger.info("Shutting down API server...")
+    await thumbnail_prewarmer.stop()
+    await image_resolver.stop()
+    await person_summary_view.stop()
+    await event_follower.stop()
+    shutdown_executor()
     await close_mongo_connection()
 
+async def label_route(request: Request):
+    """Tag the database commands a request issues with its route template."""
+    label = current_route.get()
+    if label is not None:
+        label.route = route_template(request.scope)
+
 # --- App Initialization ---
 app = FastAPI(
     title="Animated Dashboard API",
     description="API for fetching alerts and images from MongoDB for the animated dashboard.",
     version="1.0.0",
     lifespan=lifespan,
+    dependencies=[Depends(label_route)],
     # Generate operation IDs that are function names, for cleaner client code generation
     openapi_url="/api/v1/openapi.json",
     docs_url="/api/docs",
@@ -41,10 +76,30 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
-    allow_methods=["GET"], # Only allow GET requests for this read-only service
+    # Read-only service; POST is only used for batch lookups with large id lists
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
+    # Let browser clients read the keyset pagination cursor
+    expose_headers=["X-Next-Cursor"],
 )
 
+# --- Metrics ---
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time every request by route template."""
+    label = RouteLabel()
+    token = current_route.set(label)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        label.route = route_template(request.scope)
+        http_request_duration.observe(time.perf_counter() - started, method=request.method, route=label.route, status=status)
+        current_route.reset(token)
+
 # --- API Routers ---
 # Include the routers for different parts of the API
 app.include_router(alerts.router, prefix="/api/v1", tags=["Alerts"])
@@ -64,6 +119,11 @@ def health_check():
     """Health check endpoint for monitoring and deployment verification."""
     return {"status": "healthy", "service": "DFIP API"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics in the text exposition format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/v1")
 def read_api_root():
     """A simple endpoint to confirm the API is running."""
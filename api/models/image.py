@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List
 from api.models.common import PyObjectId
 
 class GridFSMetaDataSchema(BaseModel):
@@ -36,3 +37,12 @@ class GridFSFileSchema(BaseModel):
                 "filename": "image-642f8d06.jpg"
             }
         }
+
+# Upper bound on how many image_ids one batch lookup may resolve
+MAX_BATCH_IMAGE_IDS = 500
+
+class ImageIdsRequest(BaseModel):
+    """
+    Request body for resolving many `image_id` values in one call.
+    """
+    image_ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_IMAGE_IDS)
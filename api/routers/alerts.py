@@ -1,27 +1,39 @@
-from fastapi import APIRouter, Query, HTTPException, Depends
-from typing import List, Optional
+import asyncio
+from fastapi import APIRouter, Query, HTTPException, Depends, Header, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Literal, Optional
 from datetime import datetime
 from bson import ObjectId
+from pydantic import TypeAdapter
 
 from api.models.alert import AlertSchema
 from api.db.mongodb import db, get_db
+from api.db.explain import explain_find_report, explain_mode, explain_response
+from api.core.config import settings
+from api.core.fast_json import json_response
+from api.core.pagination import encode_cursor, keyset_filter
+from api.services.alert_broadcaster import alert_broadcaster, serialize_alert
+from api.services.alert_export import EXPORT_FORMATS, export_csv, export_ndjson, iter_alert_batches
+from api.services import arrow_export
 
 router = APIRouter()
 
-@router.get("/alerts", response_model=List[AlertSchema])
-async def list_alerts(
-    page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(20, ge=1, le=100, description="Items per page"),
-    start_time: Optional[datetime] = Query(None, description="Start of time range (ISO format)"),
-    end_time: Optional[datetime] = Query(None, description="End of time range (ISO format)"),
-    level: Optional[str] = Query(None, description="Filter by alert level (alert, info, warning)"),
-    camera_id: Optional[str] = Query(None, description="Filter by camera ID"),
-    person_id: Optional[str] = Query(None, description="Filter by person ID"),
-    message_search: Optional[str] = Query(None, description="Text search in the message field"),
-    db_session = Depends(get_db)
-):
+# Sort order shared by the list endpoint and its keyset cursor.
+# `_id` breaks ties between alerts with identical timestamps.
+ALERTS_SORT = [("time", -1), ("_id", -1)]
+
+ALERT_LIST_ADAPTER = TypeAdapter(List[AlertSchema])
+
+def build_alert_query(
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    level: Optional[str] = None,
+    camera_id: Optional[str] = None,
+    person_id: Optional[str] = None,
+    message_search: Optional[str] = None,
+) -> dict:
     """
-    Retrieve a paginated and filtered list of alerts.
+    Build the MongoDB filter for the alert list filters.
     """
     query = {}
 
@@ -45,16 +57,188 @@ async def list_alerts(
     if message_search:
         query["$text"] = {"$search": message_search}
         # Note: This requires a text index on the 'message' field.
-        # Let's add that to the index creation logic.
 
-    # Calculate skip and limit for pagination
-    skip = (page - 1) * page_size
+    return query
 
-    cursor = db_session.alerts_collection.find(query).sort("time", -1).skip(skip).limit(page_size)
-    alerts = await cursor.to_list(length=page_size)
+@router.get("/alerts", response_model=List[AlertSchema])
+async def list_alerts(
+    response: Response,
+    page: int = Query(1, ge=1, description="Page number (ignored when `cursor` is given)"),
+    page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the `X-Next-Cursor` header of the previous page"),
+    start_time: Optional[datetime] = Query(None, description="Start of time range (ISO format)"),
+    end_time: Optional[datetime] = Query(None, description="End of time range (ISO format)"),
+    level: Optional[str] = Query(None, description="Filter by alert level (alert, info, warning)"),
+    camera_id: Optional[str] = Query(None, description="Filter by camera ID"),
+    person_id: Optional[str] = Query(None, description="Filter by person ID"),
+    message_search: Optional[str] = Query(None, description="Text search in the message field"),
+    explain: bool = Depends(explain_mode),
+    db_session = Depends(get_db)
+):
+    """
+    Retrieve a paginated and filtered list of alerts.
+
+    Pass the `X-Next-Cursor` response header back as `cursor` to fetch the next page.
+    Cursor pages cost the same at any depth; `page` is kept for older clients.
+    """
+    query = build_alert_query(start_time, end_time, level, camera_id, person_id, message_search)
 
+    if cursor:
+        try:
+            query.update(keyset_filter("time", cursor))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        skip = 0
+    else:
+        # Calculate skip and limit for pagination
+        skip = (page - 1) * page_size
+
+    if explain:
+        return explain_response([
+            await explain_find_report("alerts", db_session.alerts_collection, query, ALERTS_SORT, skip, page_size)
+        ])
+
+    find_cursor = db_session.alerts_collection.find(query).sort(ALERTS_SORT).skip(skip).limit(page_size)
+    alerts = await find_cursor.to_list(length=page_size)
+
+    if len(alerts) == page_size:
+        last = alerts[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.get("time"), last["_id"])
+
+    if settings.FAST_JSON_RESPONSES:
+        return json_response(ALERT_LIST_ADAPTER, alerts, response)
     return alerts
 
+def _sse_event(alert_id: ObjectId, payload: str, event: str = "alert") -> str:
+    return f"id: {alert_id}\nevent: {event}\ndata: {payload}\n\n"
+
+async def _alert_events(request: Request, level: Optional[str], camera_id: Optional[str], person_id: Optional[str],
+                        resume_after: Optional[ObjectId]) -> AsyncIterator[str]:
+    """
+    Replay alerts missed since `resume_after`, then relay live alerts from the
+    broadcaster until the client disconnects or falls too far behind.
+    If more alerts were missed than one replay sends, a `reset` event tells the
+    client to refetch instead of leaving a silent gap.
+    """
+    sub = alert_broadcaster.subscribe(camera_id=camera_id, level=level, person_id=person_id)
+    try:
+        yield "retry: 3000\n\n"
+
+        # Queued alerts up to here were already covered by the replay
+        replayed_until = None
+        if resume_after is not None:
+            # Subscribed already, so anything past this mark arrives on the queue
+            bound = alert_broadcaster.high_water
+            query = build_alert_query(level=sub.level, camera_id=sub.camera_id, person_id=sub.person_id)
+            query["_id"] = {"$gt": resume_after}
+            if bound is not None:
+                query["_id"]["$lte"] = bound
+            limit = settings.ALERT_STREAM_REPLAY_LIMIT
+            last_id = resume_after
+            replayed = 0
+            truncated = False
+            # One row past the limit tells whether the replay reached the end
+            async for alert in db.alerts_collection.find(query).sort("_id", 1).limit(limit + 1):
+                if replayed == limit:
+                    truncated = True
+                    break
+                replayed += 1
+                last_id = alert["_id"]
+                try:
+                    yield _sse_event(alert["_id"], serialize_alert(alert))
+                except ValueError:
+                    continue
+            # Without a bound (the follower hasn't synced yet) the replay may
+            # overlap the queue, so queued alerts it already sent are skipped
+            replayed_until = bound if bound is not None else last_id
+            if truncated:
+                # Alerts past `last_id` were not sent; have the client refetch rather than miss them
+                yield _sse_event(replayed_until, '{"reason": "replay_limit"}', event="reset")
+
+        while not (sub.overflowed and sub.queue.empty()):
+            try:
+                alert_id, payload = await asyncio.wait_for(sub.queue.get(), timeout=settings.ALERT_STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            if replayed_until is not None and alert_id <= replayed_until:
+                continue
+            yield _sse_event(alert_id, payload)
+    finally:
+        alert_broadcaster.unsubscribe(sub)
+
+@router.get("/alerts/stream")
+async def stream_alerts(
+    request: Request,
+    level: Optional[str] = Query(None, description="Only stream alerts with this level"),
+    camera_id: Optional[str] = Query(None, description="Only stream alerts from this camera"),
+    person_id: Optional[str] = Query(None, description="Only stream alerts for this person"),
+    last_event_id: Optional[str] = Query(None, description="Resume after this alert ID (same as the Last-Event-ID header)"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Stream new alerts as Server-Sent Events.
+
+    Every connection is fed from the process-wide event follower, so open
+    dashboards share one database cursor instead of each polling `/alerts`.
+    Each event's `id` is the alert ID; reconnecting with `Last-Event-ID` first
+    replays up to `ALERT_STREAM_REPLAY_LIMIT` alerts that were missed. If more
+    were missed, a `reset` event follows the replay and the client should refetch.
+    """
+    resume_id = last_event_id_header or last_event_id
+    resume_after = None
+    if resume_id:
+        if not ObjectId.is_valid(resume_id):
+            raise HTTPException(status_code=400, detail=f"Invalid Last-Event-ID: {resume_id}")
+        resume_after = ObjectId(resume_id)
+
+    return StreamingResponse(
+        _alert_events(request, level, camera_id, person_id, resume_after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/alerts/export")
+async def export_alerts(
+    format: Literal["ndjson", "csv", "arrow"] = Query("ndjson", description="Output format; `arrow` is an Arrow IPC stream and needs pyarrow"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of alerts to export (default: all)"),
+    start_time: Optional[datetime] = Query(None, description="Start of time range (ISO format)"),
+    end_time: Optional[datetime] = Query(None, description="End of time range (ISO format)"),
+    level: Optional[str] = Query(None, description="Filter by alert level (alert, info, warning)"),
+    camera_id: Optional[str] = Query(None, description="Filter by camera ID"),
+    person_id: Optional[str] = Query(None, description="Filter by person ID"),
+    message_search: Optional[str] = Query(None, description="Text search in the message field"),
+    db_session = Depends(get_db)
+):
+    """
+    Stream every alert matching the `/alerts` filters as NDJSON, CSV or an Arrow
+    IPC stream, newest first. Rows are written as each cursor batch arrives, so
+    exports of any size run in constant memory.
+    """
+    query = build_alert_query(start_time, end_time, level, camera_id, person_id, message_search)
+    if format == "arrow":
+        if arrow_export.pa is None:
+            raise HTTPException(status_code=501, detail="Arrow export is not available: pyarrow is not installed.")
+        batches = arrow_export.iter_alert_record_batches(
+            db_session.alerts_collection, query, ALERTS_SORT, settings.EXPORT_BATCH_SIZE, limit
+        )
+        return StreamingResponse(
+            arrow_export.export_arrow_stream(batches),
+            media_type=arrow_export.ARROW_STREAM_MEDIA_TYPE,
+            headers={"Content-Disposition": 'attachment; filename="alerts.arrows"'},
+        )
+
+    batches = iter_alert_batches(db_session.alerts_collection, query, ALERTS_SORT, settings.EXPORT_BATCH_SIZE, limit)
+    media_type, extension = EXPORT_FORMATS[format]
+    rows = export_csv(batches) if format == "csv" else export_ndjson(batches)
+    return StreamingResponse(
+        rows,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="alerts.{extension}"'},
+    )
+
 @router.get("/alerts/{alert_id}", response_model=AlertSchema)
 async def get_alert(alert_id: str, db_session = Depends(get_db)):
     """
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
-from pydantic import BaseModel
-from api.db.mongodb import get_db
+from pydantic import BaseModel, TypeAdapter
+from api.core.config import settings
+from api.core.fast_json import json_response
+from api.core.result_cache import cache_key, result_cache
+from api.db.explain import explain_mode, explain_response
+from api.services.camera_stats import camera_stats_view
+from api.services.event_follower import event_follower
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,55 +25,32 @@ class CameraPerson(BaseModel):
     first_detection: Optional[str] = None
     last_detection: Optional[str] = None
 
+CAMERA_SUMMARY_LIST_ADAPTER = TypeAdapter(List[CameraSummary])
+CAMERA_PERSON_LIST_ADAPTER = TypeAdapter(List[CameraPerson])
+
 @router.get("/cameras", response_model=List[CameraSummary])
-async def get_cameras(db_session = Depends(get_db)):
-    """Get list of all cameras with their detection statistics"""
+async def get_cameras(explain: bool = Depends(explain_mode)):
+    """
+    Get list of all cameras with their detection statistics.
+    Served from per-camera tallies kept current by the event follower.
+    """
+    if explain:
+        return explain_response(
+            [await event_follower.explain_poll()],
+            note="Camera tallies are kept in memory; the only query is the event follower's poll, "
+                 "run inline when the tallies are older than STATS_MAX_STALENESS_SECONDS.",
+        )
+
+    async def _cameras():
+        await event_follower.ensure_fresh(settings.STATS_MAX_STALENESS_SECONDS)
+        return camera_stats_view.summaries()
+
     try:
-        collection = db_session.db.Event
-        
-        pipeline = [
-            {
-                "$match": {
-                    "camera_id": {"$exists": True, "$ne": None, "$ne": ""}
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$camera_id",
-                    "total_detections": {"$sum": 1},
-                    "unique_people": {"$addToSet": "$person_id"},
-                    "first_detection": {"$min": "$alert_time"},
-                    "last_detection": {"$max": "$alert_time"}
-                }
-            },
-            {
-                "$project": {
-                    "camera_id": "$_id",
-                    "total_detections": 1,
-                    "unique_people": {"$size": "$unique_people"},
-                    "first_detection": 1,
-                    "last_detection": 1,
-                    "_id": 0
-                }
-            },
-            {
-                "$sort": {"total_detections": -1}
-            }
-        ]
-        
-        results = await collection.aggregate(pipeline).to_list(length=None)
-        
-        cameras = []
-        for result in results:
-            cameras.append(CameraSummary(
-                camera_id=result["camera_id"],
-                total_detections=result["total_detections"],
-                unique_people=result["unique_people"],
-                first_detection=result.get("first_detection"),
-                last_detection=result.get("last_detection")
-            ))
-        
+        cameras = await result_cache.get_or_compute(cache_key("cameras"), _cameras)
+
         logger.info(f"Retrieved {len(cameras)} cameras")
+        if settings.FAST_JSON_RESPONSES:
+            return json_response(CAMERA_SUMMARY_LIST_ADAPTER, cameras)
         return cameras
         
     except Exception as e:
@@ -78,57 +60,19 @@ async def get_cameras(db_session = Depends(get_db)):
 @router.get("/cameras/{camera_id}/people", response_model=List[CameraPerson])
 async def get_people_by_camera(
     camera_id: str,
-    limit: Optional[int] = Query(default=100, le=1000),
-    db_session = Depends(get_db)
+    limit: Optional[int] = Query(default=100, le=1000)
 ):
-    """Get all people detected by a specific camera"""
+    """Get the people most often detected by a specific camera"""
+    async def _people():
+        await event_follower.ensure_fresh(settings.STATS_MAX_STALENESS_SECONDS)
+        return camera_stats_view.top_people(camera_id, limit)
+
     try:
-        collection = db_session.db.Event
-        
-        pipeline = [
-            {
-                "$match": {
-                    "camera_id": camera_id,
-                    "person_id": {"$exists": True, "$ne": None, "$ne": ""}
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$person_id",
-                    "detection_count": {"$sum": 1},
-                    "first_detection": {"$min": "$alert_time"},
-                    "last_detection": {"$max": "$alert_time"}
-                }
-            },
-            {
-                "$project": {
-                    "person_id": "$_id",
-                    "detection_count": 1,
-                    "first_detection": 1,
-                    "last_detection": 1,
-                    "_id": 0
-                }
-            },
-            {
-                "$sort": {"detection_count": -1}
-            },
-            {
-                "$limit": limit
-            }
-        ]
-        
-        results = await collection.aggregate(pipeline).to_list(length=None)
-        
-        people = []
-        for result in results:
-            people.append(CameraPerson(
-                person_id=result["person_id"],
-                detection_count=result["detection_count"],
-                first_detection=result.get("first_detection"),
-                last_detection=result.get("last_detection")
-            ))
+        people = await result_cache.get_or_compute(cache_key("cameras/people", camera_id=camera_id, limit=limit), _people)
         
         logger.info(f"Retrieved {len(people)} people for camera {camera_id}")
+        if settings.FAST_JSON_RESPONSES:
+            return json_response(CAMERA_PERSON_LIST_ADAPTER, people)
         return people
         
     except Exception as e:
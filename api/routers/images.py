@@ -1,24 +1,61 @@
-import io
-from fastapi import APIRouter, HTTPException, Depends, Response
-from fastapi.responses import StreamingResponse
+import asyncio
+import os
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from bson import ObjectId
-from PIL import Image
-from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from gridfs.errors import NoFile
 
-from api.models.image import GridFSFileSchema
+from api.models.image import GridFSFileSchema, ImageIdsRequest, MAX_BATCH_IMAGE_IDS
 from api.db.mongodb import db, get_db
+from api.db.explain import explain_find_report, explain_mode, explain_response
 from api.core.config import settings
+from api.core.disk_cache import image_disk_cache
+from api.core.http_cache import (
+    IMMUTABLE_CACHE_CONTROL, RangeNotSatisfiable, etag_matches, http_date, modified_since, not_modified, parse_range
+)
+from api.services.derivatives import (
+    DERIVATIVE_FORMATS, SUPPORTED_FORMATS, derivative_cache, derivative_etag, derivative_size, get_derivative_bytes,
+    negotiate_format
+)
+from api.services.contact_sheets import (
+    SHEET_FORMATS, contact_sheet_cache, find_sheet_images, get_contact_sheet, sheet_layout
+)
+from api.services.image_index import ImageRecord, image_resolver
+from api.services.thumbnails import get_thumbnail_bytes, thumbnail_cache, thumbnail_etag, thumbnail_flight
 
 router = APIRouter()
 
-THUMBNAIL_SIZE = (200, 200)
-THUMBNAIL_BUCKET_NAME = "thumbnails"
+async def _explain_image_lookup(image_id: str, db_session, by_file_id: bool = False, thumbnail: bool = False):
+    """
+    Explain the lookups an image_id endpoint runs: the `metadata.image_id` match,
+    optionally its fallback to the file `_id`, and the thumbnail bucket lookup.
+    """
+    files = db_session.db[f"{settings.GRIDFS_BUCKET_NAME}.files"]
+    reports = [await explain_find_report("image by image_id", files, {"metadata.image_id": image_id}, limit=1)]
+    if by_file_id and ObjectId.is_valid(image_id):
+        reports.append(await explain_find_report("image by file id", files, {"_id": ObjectId(image_id)}, limit=1))
+
+    note = None
+    if thumbnail:
+        note = ("These are the lookups an image index miss runs; indexed image_ids resolve in memory, "
+                "and thumbnails held in the in-process cache skip the thumbnail bucket lookup.")
+        file_doc = await files.find_one({"metadata.image_id": image_id}, {"_id": 1})
+        if file_doc is not None:
+            thumbs = db_session.db[f"{settings.GRIDFS_BUCKET_NAME}_thumbnails.files"]
+            reports.append(await explain_find_report(
+                "thumbnail by original", thumbs, {"metadata.original_id": file_doc["_id"]}, limit=1
+            ))
+    return explain_response(reports, note=note)
 
 @router.get("/images/by-image-id/{image_id}", response_model=GridFSFileSchema)
-async def get_image_metadata_by_image_id(image_id: str, db_session = Depends(get_db)):
+async def get_image_metadata_by_image_id(image_id: str, explain: bool = Depends(explain_mode), db_session = Depends(get_db)):
     """
     Retrieve GridFS file metadata using the custom `image_id` from the alert.
     """
+    if explain:
+        return await _explain_image_lookup(image_id, db_session)
     try:
         file_doc = await db_session.db[f"{settings.GRIDFS_BUCKET_NAME}.files"].find_one({"metadata.image_id": image_id})
         if file_doc is None:
@@ -27,152 +64,402 @@ async def get_image_metadata_by_image_id(image_id: str, db_session = Depends(get
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving image metadata: {str(e)}")
 
+def image_ids_query(image_ids: List[str]) -> dict:
+    """Filter resolving many alert image_ids on the GridFS files collection."""
+    return {"metadata.image_id": {"$in": list(dict.fromkeys(image_ids))}}
+
+async def _find_images_by_image_ids(image_ids: List[str], db_session) -> Dict[str, dict]:
+    """Resolve many image_ids with a single `$in` query on the metadata.image_id index."""
+    cursor = db_session.db[f"{settings.GRIDFS_BUCKET_NAME}.files"].find(image_ids_query(image_ids))
+    return {doc["metadata"]["image_id"]: doc async for doc in cursor}
+
+async def _explain_images_by_image_ids(image_ids: List[str], db_session):
+    files = db_session.db[f"{settings.GRIDFS_BUCKET_NAME}.files"]
+    return explain_response([await explain_find_report("images by image_ids", files, image_ids_query(image_ids))])
+
+@router.get("/images/by-image-ids", response_model=Dict[str, GridFSFileSchema])
+async def get_images_metadata_by_image_ids(
+    image_ids: List[str] = Query(..., min_length=1, max_length=MAX_BATCH_IMAGE_IDS, description="Repeat for each image_id"),
+    explain: bool = Depends(explain_mode),
+    db_session = Depends(get_db)
+):
+    """
+    Retrieve GridFS file metadata for many alert `image_id` values at once.
+    Returns a map of image_id to file metadata; ids with no image are omitted.
+    """
+    if explain:
+        return await _explain_images_by_image_ids(image_ids, db_session)
+    try:
+        return await _find_images_by_image_ids(image_ids, db_session)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving image metadata: {str(e)}")
+
+@router.post("/images/by-image-ids", response_model=Dict[str, GridFSFileSchema])
+async def post_images_metadata_by_image_ids(request: ImageIdsRequest, explain: bool = Depends(explain_mode),
+                                             db_session = Depends(get_db)):
+    """
+    Same as the GET variant, for id lists too long to fit in a URL.
+    """
+    if explain:
+        return await _explain_images_by_image_ids(request.image_ids, db_session)
+    try:
+        return await _find_images_by_image_ids(request.image_ids, db_session)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving image metadata: {str(e)}")
+
+async def _resolve_image(image_id: str) -> ImageRecord:
+    """Map an alert's image_id to its GridFS original and thumbnail through the in-memory index."""
+    record = await image_resolver.resolve(image_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Image with image_id '{image_id}' not found.")
+    return record
+
+async def _stream_range(grid_out, start: int, end: int):
+    """Yield bytes [start, end] of a GridFS file, reading only the chunks that hold them."""
+    grid_out.seek(start)
+    remaining = end - start + 1
+    while remaining > 0:
+        chunk = await grid_out.readchunk()
+        if not chunk:
+            break
+        chunk = chunk[:remaining]
+        remaining -= len(chunk)
+        yield chunk
+
+async def _stream_into_disk_cache(grid_out, writer):
+    """Yield a GridFS file's chunks while copying them to the disk cache; an interrupted copy is dropped."""
+    try:
+        async for chunk in grid_out:
+            await asyncio.to_thread(writer.write, chunk)
+            yield chunk
+    except BaseException:
+        writer.abort()
+        raise
+    await asyncio.to_thread(writer.commit)
+
 @router.get("/images/{file_id}/bytes")
-async def stream_image_bytes(file_id: str, db_session = Depends(get_db)):
+async def stream_image_bytes(
+    file_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    db_session = Depends(get_db)
+):
     """
     Stream the full-size image bytes directly from GridFS.
+    Supports single `Range` requests (served by seeking to the containing chunk)
+    and revalidation through `If-None-Match` / `If-Modified-Since`.
+    With IMAGE_DISK_CACHE_DIR set, full downloads are also written to local disk
+    and later requests are sent from there without touching the database.
     """
     if not ObjectId.is_valid(file_id):
         raise HTTPException(status_code=400, detail="Invalid file ID.")
 
-    gridfs_bucket = db_session.fs
-    try:
-        gridfs_stream = await gridfs_bucket.open_download_stream(ObjectId(file_id))
+    disk_key = f"{settings.GRIDFS_BUCKET_NAME}/{file_id}"
+    cached = await asyncio.to_thread(image_disk_cache.get, disk_key) if image_disk_cache is not None else None
+    if cached is not None:
+        try:
+            cached_stat = await asyncio.to_thread(os.stat, cached.path)
+        except FileNotFoundError:
+            # Evicted by a concurrent write since the lookup; serve it from GridFS instead
+            cached = None
+    if cached is not None:
+        content_type = cached.meta["content_type"]
+        etag = cached.meta["etag"]
+        upload_date = datetime.fromisoformat(cached.meta["upload_date"])
+        length = cached.meta["length"]
+    else:
+        gridfs_bucket = db_session.fs
+        try:
+            gridfs_stream = await gridfs_bucket.open_download_stream(ObjectId(file_id))
+        except NoFile:
+            raise HTTPException(status_code=404, detail="Image file not found.")
+
         # Determine content type based on filename extension
         content_type = "image/jpeg" # Default
         if gridfs_stream.filename and (gridfs_stream.filename.lower().endswith(".png")):
             content_type = "image/png"
 
-        return StreamingResponse(gridfs_stream, media_type=content_type)
-    except Exception: # Should be more specific, e.g., NoFile
-        raise HTTPException(status_code=404, detail="Image file not found.")
+        # GridFS files are immutable by _id, so the md5 (or the id) is a strong validator
+        etag = f'"{gridfs_stream.md5 or gridfs_stream._id}"'
+        upload_date = gridfs_stream.upload_date
+        length = gridfs_stream.length
+
+    last_modified = http_date(upload_date)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+    if if_none_match is not None:
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, last_modified=last_modified)
+    elif not modified_since(if_modified_since, upload_date):
+        return not_modified(etag, last_modified=last_modified)
+
+    if cached is not None:
+        # Sent with sendfile where the server supports it; FileResponse handles Range and If-Range itself
+        return FileResponse(cached.path, media_type=content_type, headers=headers, stat_result=cached_stat)
+
+    byte_range = None
+    if if_range is None or if_range.strip() in (etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, length)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{length}"})
+
+    if byte_range is None:
+        body = gridfs_stream
+        if image_disk_cache is not None:
+            meta = {"content_type": content_type, "etag": etag, "upload_date": upload_date.isoformat(), "length": length}
+            writer = await asyncio.to_thread(image_disk_cache.writer, disk_key, meta)
+            body = _stream_into_disk_cache(gridfs_stream, writer)
+        return StreamingResponse(body, media_type=content_type, headers={**headers, "Content-Length": str(length)})
+
+    start, end = byte_range
+    return StreamingResponse(
+        _stream_range(gridfs_stream, start, end),
+        status_code=206,
+        media_type=content_type,
+        headers={**headers, "Content-Range": f"bytes {start}-{end}/{length}", "Content-Length": str(end - start + 1)},
+    )
 
 @router.get("/images/{file_id}/thumb")
-async def stream_image_thumbnail(file_id: str, db_session = Depends(get_db)):
+async def stream_image_thumbnail(
+    file_id: str,
+    if_none_match: Optional[str] = Header(None),
+    db_session = Depends(get_db)
+):
     """
     Stream a cached thumbnail. If the thumbnail doesn't exist, it's created,
-    cached in a separate GridFS bucket, and then streamed.
+    cached in the same GridFS thumbnail bucket as the by-image-id endpoints
+    (the one the prewarmer and backfill fill), and then streamed.
+    """
+    return await stream_image_thumbnail_with_bucket(
+        file_id, settings.GRIDFS_BUCKET_NAME, db_session, if_none_match=if_none_match
+    )
+
+@router.get("/images/by-image-id/{image_id}/thumb")
+async def stream_image_thumbnail_by_image_id(
+    image_id: str,
+    if_none_match: Optional[str] = Header(None),
+    explain: bool = Depends(explain_mode),
+    db_session = Depends(get_db)
+):
+    """
+    Stream a thumbnail using the custom image_id from the alert.
+    The image_id may also be the GridFS file id itself.
+    """
+    if explain:
+        return await _explain_image_lookup(image_id, db_session, by_file_id=True, thumbnail=True)
+
+    record = await _resolve_image(image_id)
+    return await stream_image_thumbnail_with_bucket(
+        str(record.file_id), settings.GRIDFS_BUCKET_NAME, db_session,
+        if_none_match=if_none_match, thumb_id=record.thumb_id
+    )
+
+@router.get("/images/by-image-id/{image_id}/thumbnail")
+async def get_image_thumbnail_by_image_id(
+    image_id: str,
+    if_none_match: Optional[str] = Header(None),
+    explain: bool = Depends(explain_mode),
+    db_session = Depends(get_db)
+):
+    """
+    Stream thumbnail for image using the custom `image_id` from the alert.
+    Same as `/by-image-id/{image_id}/thumb`.
+    """
+    if explain:
+        return await _explain_image_lookup(image_id, db_session, by_file_id=True, thumbnail=True)
+
+    record = await _resolve_image(image_id)
+    return await stream_image_thumbnail_with_bucket(
+        str(record.file_id), settings.GRIDFS_BUCKET_NAME, db_session,
+        if_none_match=if_none_match, thumb_id=record.thumb_id
+    )
+
+async def stream_image_thumbnail_with_bucket(file_id: str, bucket_name: str, db_session,
+                                             thumb_bucket_name: Optional[str] = None,
+                                             if_none_match: Optional[str] = None,
+                                             thumb_id: Optional[ObjectId] = None):
+    """
+    Helper function to stream thumbnail from specific bucket.
+    Thumbnails are cached in `thumb_bucket_name` (default `<bucket_name>_thumbnails`)
+    and in process memory; missing ones are rendered in the worker pool, once per
+    file however many requests ask for it at the same time.
+    Responses carry a strong ETag and are immutable, so revalidation is a 304.
     """
     if not ObjectId.is_valid(file_id):
         raise HTTPException(status_code=400, detail="Invalid file ID.")
 
-    thumb_bucket = AsyncIOMotorGridFSBucket(db_session.db, bucket_name=THUMBNAIL_BUCKET_NAME)
-
-    # Check if thumbnail already exists
-    existing_thumb = await db_session.db[f"{THUMBNAIL_BUCKET_NAME}.files"].find_one({"metadata.original_id": ObjectId(file_id)})
-    if existing_thumb:
-        thumb_stream = await thumb_bucket.open_download_stream(existing_thumb["_id"])
-        return StreamingResponse(thumb_stream, media_type="image/jpeg")
+    original_id = ObjectId(file_id)
+    thumb_bucket_name = thumb_bucket_name or f"{bucket_name}_thumbnails"
+    etag = thumbnail_etag(original_id, thumb_bucket_name)
+    if etag_matches(if_none_match, etag, allow_wildcard=False):
+        return not_modified(etag)
 
-    # If not, generate it
-    original_image_stream = io.BytesIO()
     try:
-        await db_session.fs.download_to_stream(ObjectId(file_id), original_image_stream)
-        original_image_stream.seek(0)
-
-        with Image.open(original_image_stream) as img:
-            img.thumbnail(THUMBNAIL_SIZE)
-            thumb_io = io.BytesIO()
-            img.convert("RGB").save(thumb_io, "JPEG", quality=90)
-            thumb_io.seek(0)
-
-            # Cache the thumbnail in GridFS
-            await thumb_bucket.upload_from_stream(
-                f"thumb_{file_id}.jpg",
-                thumb_io,
-                metadata={"original_id": ObjectId(file_id), "contentType": "image/jpeg"}
-            )
-
-            # Rewind and stream it back
-            thumb_io.seek(0)
-            return StreamingResponse(thumb_io, media_type="image/jpeg")
+        thumb_bytes = await get_thumbnail_bytes(db_session.db, original_id, bucket_name, thumb_bucket_name, thumb_id)
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=f"Could not find or process original image. Error: {e}")
+    if etag_matches(if_none_match, etag):
+        # `*`, now that the thumbnail is known to exist
+        return not_modified(etag)
+
+    return Response(
+        content=thumb_bytes,
+        media_type="image/jpeg",
+        headers={"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL},
+    )
 
+async def _derivative_response(file_id: ObjectId, size: int, format: Optional[str], accept: Optional[str],
+                               if_none_match: Optional[str], db_session) -> Response:
+    fmt = format or negotiate_format(accept)
+    if fmt not in SUPPORTED_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format '{fmt}' is not supported by this server.")
+    size = derivative_size(size)
+    etag = derivative_etag(file_id, size, fmt)
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if format is None:
+        # The same URL yields a different encoding per Accept header
+        headers["Vary"] = "Accept"
+    if etag_matches(if_none_match, etag, allow_wildcard=False):
+        response = not_modified(etag)
+        response.headers.update(headers)
+        return response
+
+    try:
+        data = await get_derivative_bytes(db_session.db, file_id, size, fmt, settings.GRIDFS_BUCKET_NAME)
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Could not find or process original image. Error: {e}")
+    if etag_matches(if_none_match, etag):
+        # `*`, now that the derivative is known to exist
+        response = not_modified(etag)
+        response.headers.update(headers)
+        return response
+    return Response(content=data, media_type=DERIVATIVE_FORMATS[fmt][1], headers=headers)
 
-@router.get("/images/by-image-id/{image_id}/thumb")
-async def stream_image_thumbnail_by_image_id(image_id: str, db_session = Depends(get_db)):
+@router.get("/images/{file_id}/derivative")
+async def stream_image_derivative(
+    file_id: str,
+    size: int = Query(640, ge=1, le=4096, description="Longest edge wanted, rounded up to 64, 200, 640 or 1280"),
+    format: Optional[Literal["avif", "webp", "jpeg"]] = Query(None, description="Output format (default: negotiated from Accept)"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db_session = Depends(get_db)
+):
     """
-    Stream a thumbnail using the custom image_id from the alert.
-    First finds the file by image_id, then generates/returns the thumbnail.
+    Stream a downscaled copy of an image, sized for previews rather than the
+    full-resolution original. Without `format`, AVIF or WebP is sent to clients
+    that accept it and JPEG otherwise. Each (image, size, format) is rendered
+    once and kept in GridFS and in process memory.
     """
-    # First try to find by metadata.image_id
-    file_doc = await db_session.db[f"{settings.GRIDFS_BUCKET_NAME}.files"].find_one({"metadata.image_id": image_id})
-    
-    # If not found, try to find by MongoDB ObjectId (treat image_id as file_id)
-    if file_doc is None:
-        try:
-            if ObjectId.is_valid(image_id):
-                file_doc = await db_session.db[f"{settings.GRIDFS_BUCKET_NAME}.files"].find_one({"_id": ObjectId(image_id)})
-        except:
-            pass
-    
-    if file_doc is None:
-        raise HTTPException(status_code=404, detail=f"Image with image_id '{image_id}' not found.")
-    
-    file_id = str(file_doc["_id"])
-    
-    # Now call the existing thumbnail function with the correct bucket name
-    return await stream_image_thumbnail_with_bucket(file_id, settings.GRIDFS_BUCKET_NAME, db_session)
+    if not ObjectId.is_valid(file_id):
+        raise HTTPException(status_code=400, detail="Invalid file ID.")
+    return await _derivative_response(ObjectId(file_id), size, format, accept, if_none_match, db_session)
 
+@router.get("/images/by-image-id/{image_id}/derivative")
+async def stream_image_derivative_by_image_id(
+    image_id: str,
+    size: int = Query(640, ge=1, le=4096, description="Longest edge wanted, rounded up to 64, 200, 640 or 1280"),
+    format: Optional[Literal["avif", "webp", "jpeg"]] = Query(None, description="Output format (default: negotiated from Accept)"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db_session = Depends(get_db)
+):
+    """
+    Same as `/images/{file_id}/derivative`, using the custom `image_id` from the alert.
+    """
+    record = await _resolve_image(image_id)
+    return await _derivative_response(record.file_id, size, format, accept, if_none_match, db_session)
 
-@router.get("/images/by-image-id/{image_id}/thumbnail")
-async def get_image_thumbnail_by_image_id(image_id: str, db_session = Depends(get_db)):
+@router.get("/images/debug/cache")
+async def debug_thumbnail_cache():
     """
-    Stream thumbnail for image using the custom `image_id` from the alert.
+    Hit, miss and eviction counters for the in-process thumbnail cache.
     """
-    # First find the file using image_id  
-    file_doc = await db_session.db[f"{settings.GRIDFS_BUCKET_NAME}.files"].find_one({"metadata.image_id": image_id})
-    
-    if file_doc is None:
-        raise HTTPException(status_code=404, detail=f"Image with image_id '{image_id}' not found.")
-    
-    file_id = str(file_doc["_id"])
-    
-    # Now call the existing thumbnail function with the correct bucket name
-    return await stream_image_thumbnail_with_bucket(file_id, settings.GRIDFS_BUCKET_NAME, db_session)
+    return {
+        "thumbnail_cache": thumbnail_cache.stats(),
+        "thumbnail_renders": {"calls": thumbnail_flight.calls, "shared": thumbnail_flight.shared},
+        "contact_sheet_cache": contact_sheet_cache.stats(),
+        "derivative_cache": derivative_cache.stats(),
+        "disk_cache": image_disk_cache.stats() if image_disk_cache is not None else None,
+        "image_index": image_resolver.stats(),
+    }
 
-async def stream_image_thumbnail_with_bucket(file_id: str, bucket_name: str, db_session):
+@router.delete("/images/debug/cache", status_code=204)
+async def clear_image_caches():
     """
-    Helper function to stream thumbnail from specific bucket
+    Empty the in-process thumbnail, derivative and contact sheet caches and the
+    image disk cache, so the next requests start cold. Needs IMAGE_CACHE_CLEAR_ENABLED.
     """
-    if not ObjectId.is_valid(file_id):
-        raise HTTPException(status_code=400, detail="Invalid file ID.")
+    if not settings.IMAGE_CACHE_CLEAR_ENABLED:
+        raise HTTPException(status_code=403, detail="Clearing the image caches is disabled; set IMAGE_CACHE_CLEAR_ENABLED=true to use it.")
+    thumbnail_cache.clear()
+    derivative_cache.clear()
+    contact_sheet_cache.clear()
+    if image_disk_cache is not None:
+        await asyncio.to_thread(image_disk_cache.clear)
 
-    thumb_bucket = AsyncIOMotorGridFSBucket(db_session.db, bucket_name=f"{bucket_name}_thumbnails")
-    main_bucket = AsyncIOMotorGridFSBucket(db_session.db, bucket_name=bucket_name)
+async def _contact_sheet_layout(person_id, camera_id, limit, columns, tile_size, format):
+    if not person_id and not camera_id:
+        raise HTTPException(status_code=400, detail="Either person_id or camera_id is required.")
+    entries = await find_sheet_images(person_id, camera_id, limit)
+    if not entries:
+        raise HTTPException(status_code=404, detail="No images found for this person or camera.")
+    return entries, sheet_layout(entries, columns, tile_size, format)
+
+@router.get("/images/contact-sheet/map")
+async def get_contact_sheet_map(
+    person_id: Optional[str] = Query(None, description="Images of this person"),
+    camera_id: Optional[str] = Query(None, description="Images from this camera"),
+    limit: int = Query(100, ge=1, le=400, description="Maximum number of tiles, newest first"),
+    columns: int = Query(10, ge=1, le=40, description="Tiles per row"),
+    tile_size: int = Query(100, ge=16, le=200, description="Tile edge in pixels"),
+    format: Literal["jpeg", "webp"] = Query("jpeg", description="Sheet image format"),
+):
+    """
+    Describe the contact sheet for a person or camera: the pixel offset of each
+    image_id's tile, plus the `sheet_id` the rendered sheet is cached under.
+    """
+    _, layout = await _contact_sheet_layout(person_id, camera_id, limit, columns, tile_size, format)
+    return layout
 
-    # Check if thumbnail already exists in the database collection
-    existing_thumb = await db_session.db[f"{bucket_name}_thumbnails.files"].find_one({"metadata.original_id": ObjectId(file_id)})
-    if existing_thumb:
-        thumb_stream = await thumb_bucket.open_download_stream(existing_thumb["_id"])
-        return StreamingResponse(thumb_stream, media_type="image/jpeg")
+@router.get("/images/contact-sheet")
+async def get_contact_sheet_image(
+    person_id: Optional[str] = Query(None, description="Images of this person"),
+    camera_id: Optional[str] = Query(None, description="Images from this camera"),
+    limit: int = Query(100, ge=1, le=400, description="Maximum number of tiles, newest first"),
+    columns: int = Query(10, ge=1, le=40, description="Tiles per row"),
+    tile_size: int = Query(100, ge=16, le=200, description="Tile edge in pixels"),
+    format: Literal["jpeg", "webp"] = Query("jpeg", description="Sheet image format"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Stream a single image tiling the thumbnails of a person or camera, so a whole
+    gallery loads in one request. Use `/images/contact-sheet/map` with the same
+    parameters to find each image's tile.
+    """
+    entries, layout = await _contact_sheet_layout(person_id, camera_id, limit, columns, tile_size, format)
+    etag = f'"{layout["sheet_id"]}"'
+    # The same URL gains tiles as new alerts arrive, so clients must revalidate
+    cache_control = "public, no-cache"
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control=cache_control)
 
-    # If not, generate it
-    original_image_stream = io.BytesIO()
     try:
-        await main_bucket.download_to_stream(ObjectId(file_id), original_image_stream)
-        original_image_stream.seek(0)
-
-        with Image.open(original_image_stream) as img:
-            img.thumbnail(THUMBNAIL_SIZE)
-            thumb_io = io.BytesIO()
-            img.convert("RGB").save(thumb_io, "JPEG", quality=90)
-            thumb_io.seek(0)
-
-            # Cache the thumbnail in GridFS
-            await thumb_bucket.upload_from_stream(
-                f"thumb_{file_id}.jpg",
-                thumb_io,
-                metadata={"original_id": ObjectId(file_id), "contentType": "image/jpeg"}
-            )
-
-            # Rewind and stream it back
-            thumb_io.seek(0)
-            return StreamingResponse(thumb_io, media_type="image/jpeg")
-
+        sheet = await get_contact_sheet(entries, layout)
     except Exception as e:
-        raise HTTPException(status_code=404, detail=f"Could not find or process original image. Error: {e}")
+        raise HTTPException(status_code=500, detail=f"Could not render contact sheet. Error: {e}")
+    return Response(
+        content=sheet,
+        media_type=SHEET_FORMATS[format][1],
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
 
 @router.get("/images/debug/list")
 async def debug_list_images(db_session = Depends(get_db)):
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import Annotated, List, Literal, Optional, Tuple, Union
 from datetime import datetime
 from bson import ObjectId
 
 from api.db.mongodb import get_db
-from pydantic import BaseModel, Field
+from api.db.explain import explain_aggregate_report, explain_mode, explain_response
+from api.core.config import settings
+from api.core.fast_json import json_response
+from api.core.pagination import encode_cursor, keyset_filter
+from api.core.result_cache import cache_key, result_cache
+from api.services.person_summary import person_summary_view, summary_group_stage
+from pydantic import BaseModel, Field, TypeAdapter
 
 router = APIRouter()
 
@@ -16,7 +22,8 @@ class PersonSummary(BaseModel):
     alert_count: int = Field(..., description="Total number of alerts for this person")
     first_seen: datetime = Field(..., description="Date of first alert")
     last_seen: datetime = Field(..., description="Date of most recent alert")
-    image_ids: List[str] = Field(..., description="List of all image IDs for this person")
+    image_count: int = Field(0, description="Number of alerts with an image for this person")
+    image_ids: List[str] = Field(..., description="Most recent image IDs for this person")
     sample_image_id: Optional[str] = Field(None, description="One image ID to use as profile picture")
 
 class PersonImage(BaseModel):
@@ -29,47 +36,129 @@ class PersonImage(BaseModel):
     alert_level: str = Field(..., description="Alert level (alert, info, warning)")
     message: str = Field(..., description="Alert message")
 
+PERSON_SUMMARY_LIST_ADAPTER = TypeAdapter(List[PersonSummary])
+PERSON_IMAGE_LIST_ADAPTER = TypeAdapter(List[PersonImage])
+
+# How many of a person's most recent image IDs to return: a count, or "all"
+ImageIdsLimit = Union[Annotated[int, Field(ge=0, le=500)], Literal["all"]]
+DEFAULT_IMAGE_IDS_LIMIT = 20
+
+def image_ids_cap(limit: ImageIdsLimit) -> Optional[int]:
+    """The `$limit` for an ImageIdsLimit; None means every image ID."""
+    return None if limit == "all" else limit
+
+# Sort keys accepted by GET /people, mapped to fields of the grouped summary
+PEOPLE_SORT_FIELDS = {
+    "last_seen": "last_seen",
+    "first_seen": "first_seen",
+    "alert_count": "alert_count",
+    "person_id": "_id",
+}
+
+def build_people_pipeline(page_size: int, sort: str, order: str, image_ids_limit: Optional[int],
+                          alerts_collection_name: str, cursor: Optional[str] = None) -> list:
+    """
+    The aggregate GET /people runs on the person_summary collection (`_id` is the
+    person_id). `image_ids_limit` of None includes every image ID, 0 none.
+    Raises ValueError for a malformed cursor.
+    """
+    sort_field = PEOPLE_SORT_FIELDS[sort]
+    descending = order == "desc"
+    direction = -1 if descending else 1
+    pipeline = []
+    if cursor:
+        pipeline.append({"$match": keyset_filter(sort_field, cursor, descending)})
+    pipeline += [
+        {"$sort": {sort_field: direction, "_id": direction}},
+        {"$limit": page_size},
+    ]
+    if image_ids_limit != 0:
+        # Only the people on this page pay for an image lookup, served by the (person_id, time) index
+        images = [
+            {"$match": {"$expr": {"$eq": ["$person_id", "$$person_id"]}, "image_id": {"$ne": None}}},
+            {"$sort": {"time": -1}},
+        ]
+        if image_ids_limit is not None:
+            images.append({"$limit": image_ids_limit})
+        images.append({"$project": {"_id": 0, "image_id": 1}})
+        pipeline.append({
+            "$lookup": {
+                "from": alerts_collection_name,
+                "let": {"person_id": "$_id"},
+                "pipeline": images,
+                "as": "images",
+            }
+        })
+    return pipeline
+
+def person_images_query(person_id: str) -> Tuple[dict, list]:
+    """Filter and sort for GET /people/{person_id}/images."""
+    return {"person_id": person_id}, [("time", -1)]
+
+def person_image_ids_query(person_id: str) -> Tuple[dict, list]:
+    """Filter and sort (most recent first) for the image_ids of GET /people/{person_id}."""
+    return {"person_id": person_id, "image_id": {"$ne": None}}, [("time", -1)]
+
 @router.get("/people", response_model=List[PersonSummary])
-async def list_people(db_session = Depends(get_db)):
+async def list_people(
+    response: Response,
+    page_size: int = Query(100, ge=1, le=500, description="People per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the `X-Next-Cursor` header of the previous page"),
+    sort: Literal["last_seen", "first_seen", "alert_count", "person_id"] = Query("last_seen", description="Sort key"),
+    order: Literal["asc", "desc"] = Query("desc", description="Sort direction"),
+    image_ids_limit: ImageIdsLimit = Query(DEFAULT_IMAGE_IDS_LIMIT, description="Most recent image IDs to include per person: 0 for none, `all` for every one"),
+    explain: bool = Depends(explain_mode),
+    db_session = Depends(get_db)
+):
     """
-    Get all unique people from the alerts collection with their statistics
+    Get a page of unique people with their statistics, read from the incrementally
+    maintained person_summary collection with an indexed range scan.
+    Pass the `X-Next-Cursor` response header back as `cursor` for the next page.
     """
+    sort_field = PEOPLE_SORT_FIELDS[sort]
     try:
-        # Aggregate to get person statistics
-        pipeline = [
-            {
-                "$group": {
-                    "_id": "$person_id",
-                    "alert_count": {"$sum": 1},
-                    "first_seen": {"$min": "$time"},
-                    "last_seen": {"$max": "$time"},
-                    "image_ids": {"$push": "$image_id"},
-                    "sample_image_id": {"$first": "$image_id"}
-                }
-            },
-            {
-                "$sort": {"last_seen": -1}  # Sort by most recent activity
-            }
-        ]
-        
-        results = await db_session.db.Event.aggregate(pipeline).to_list(length=None)
-        
-        people = []
-        for result in results:
-            # Filter out None/null image_ids
-            valid_image_ids = [img_id for img_id in result["image_ids"] if img_id is not None]
-            
-            people.append(PersonSummary(
-                person_id=result["_id"],
-                alert_count=result["alert_count"],
-                first_seen=result["first_seen"],
-                last_seen=result["last_seen"],
-                image_ids=valid_image_ids,
-                sample_image_id=result["sample_image_id"] if result["sample_image_id"] else None
-            ))
-        
+        try:
+            pipeline = build_people_pipeline(
+                page_size, sort, order, image_ids_cap(image_ids_limit), db_session.alerts_collection.name, cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if explain:
+            return explain_response([await explain_aggregate_report("people", person_summary_view.collection, pipeline)])
+
+        async def _page():
+            results = await person_summary_view.collection.aggregate(pipeline, allowDiskUse=True).to_list(length=page_size)
+
+            people = []
+            for result in results:
+                people.append({
+                    "person_id": result["_id"],
+                    "alert_count": result["alert_count"],
+                    "first_seen": result["first_seen"],
+                    "last_seen": result["last_seen"],
+                    "image_count": result.get("image_count", 0),
+                    "image_ids": [image["image_id"] for image in result.get("images", [])],
+                    "sample_image_id": result["sample_image_id"] if result["sample_image_id"] else None,
+                })
+
+            next_cursor = None
+            if len(results) == page_size:
+                last = results[-1]
+                next_cursor = encode_cursor(last.get(sort_field), last["_id"])
+            return people, next_cursor
+
+        key = cache_key("people", page_size=page_size, cursor=cursor, sort=sort, order=order, image_ids_limit=image_ids_limit)
+        people, next_cursor = await result_cache.get_or_compute(key, _page)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
+        if settings.FAST_JSON_RESPONSES:
+            return json_response(PERSON_SUMMARY_LIST_ADAPTER, people, response)
         return people
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving people: {str(e)}")
 
@@ -79,11 +168,9 @@ async def get_person_images(person_id: str, db_session = Depends(get_db)):
     Get all images for a specific person
     """
     try:
-        # Find all alerts for this person
-        alerts = await db_session.db.Event.find(
-            {"person_id": person_id},
-            sort=[("time", -1)]  # Most recent first
-        ).to_list(length=None)
+        # Find all alerts for this person, most recent first
+        query, sort = person_images_query(person_id)
+        alerts = await db_session.db.Event.find(query, sort=sort).to_list(length=None)
         
         if not alerts:
             raise HTTPException(status_code=404, detail=f"No alerts found for person {person_id}")
@@ -91,14 +178,16 @@ async def get_person_images(person_id: str, db_session = Depends(get_db)):
         images = []
         for alert in alerts:
             if alert.get("image_id"):  # Only include alerts with images
-                images.append(PersonImage(
-                    image_id=alert["image_id"],
-                    alert_time=alert["time"],
-                    camera_id=alert.get("camera_id", "unknown"),
-                    alert_level=alert.get("level", "info"),
-                    message=alert.get("message", "")
-                ))
+                images.append({
+                    "image_id": alert["image_id"],
+                    "alert_time": alert["time"],
+                    "camera_id": alert.get("camera_id", "unknown"),
+                    "alert_level": alert.get("level", "info"),
+                    "message": alert.get("message", ""),
+                })
         
+        if settings.FAST_JSON_RESPONSES:
+            return json_response(PERSON_IMAGE_LIST_ADAPTER, images)
         return images
         
     except HTTPException:
@@ -107,41 +196,45 @@ async def get_person_images(person_id: str, db_session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error retrieving images for person: {str(e)}")
 
 @router.get("/people/{person_id}")
-async def get_person_details(person_id: str, db_session = Depends(get_db)):
+async def get_person_details(
+    person_id: str,
+    limit: ImageIdsLimit = Query(DEFAULT_IMAGE_IDS_LIMIT, description="Most recent image IDs to include: 0 for none, `all` for every one"),
+    db_session = Depends(get_db)
+):
     """
-    Get detailed information about a specific person
+    Get detailed information about a specific person.
+    `image_ids` holds the `limit` most recent image IDs, oldest first;
+    `image_count` is the total.
     """
     try:
-        # Get person summary
-        pipeline = [
-            {"$match": {"person_id": person_id}},
-            {
-                "$group": {
-                    "_id": "$person_id",
-                    "alert_count": {"$sum": 1},
-                    "first_seen": {"$min": "$time"},
-                    "last_seen": {"$max": "$time"},
-                    "image_ids": {"$push": "$image_id"},
-                    "sample_image_id": {"$first": "$image_id"},
-                    "cameras": {"$addToSet": "$camera_id"},
-                    "levels": {"$addToSet": "$level"}
-                }
-            }
-        ]
-        
-        result = await db_session.db.Event.aggregate(pipeline).to_list(length=1)
-        
-        if not result:
-            raise HTTPException(status_code=404, detail=f"Person {person_id} not found")
-        
-        person_data = result[0]
-        valid_image_ids = [img_id for img_id in person_data["image_ids"] if img_id is not None]
+        # Point lookup in the maintained summaries; fall back to aggregating this
+        # person's events if they appeared after the last summary update
+        person_data = await person_summary_view.collection.find_one({"_id": person_id})
+        if person_data is None:
+            result = await db_session.alerts_collection.aggregate([
+                {"$match": {"person_id": person_id}},
+                summary_group_stage(),
+            ], allowDiskUse=True).to_list(length=1)
+            if not result:
+                raise HTTPException(status_code=404, detail=f"Person {person_id} not found")
+            person_data = result[0]
+
+        valid_image_ids = []
+        cap = image_ids_cap(limit)
+        if cap != 0:
+            query, sort = person_image_ids_query(person_id)
+            cursor = db_session.alerts_collection.find(query, {"image_id": 1, "_id": 0}).sort(sort)
+            if cap is not None:
+                cursor = cursor.limit(cap)
+            images = await cursor.to_list(length=None)
+            valid_image_ids = [image["image_id"] for image in reversed(images)]
         
         return {
             "person_id": person_data["_id"],
             "alert_count": person_data["alert_count"],
             "first_seen": person_data["first_seen"],
             "last_seen": person_data["last_seen"],
+            "image_count": person_data.get("image_count", 0),
             "image_ids": valid_image_ids,
             "sample_image_id": person_data["sample_image_id"] if person_data["sample_image_id"] else None,
             "cameras_detected": person_data["cameras"],
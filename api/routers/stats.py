@@ -1,9 +1,13 @@
-import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
-from typing import List
-from api.db.mongodb import db, get_db
+from typing import Dict, List, Literal, Optional
+from api.core.config import settings
+from api.core.result_cache import cache_key, result_cache
+from api.db.explain import explain_mode, explain_response
+from api.services.event_follower import event_follower
+from api.services.stats_engine import stats_engine
+from api.services.rollups import time_rollups
 
 router = APIRouter()
 
@@ -15,48 +19,26 @@ class StatsSchema(BaseModel):
     alerts_24h: int = Field(..., description="Number of alerts in the last 24 hours.")
     distinct_people: int = Field(..., description="Count of unique person_id values.")
     active_cameras: int = Field(..., description="Count of unique camera_id values.")
+    as_of: Optional[datetime] = Field(None, description="When the counters were last synced with the database (UTC).")
+    staleness_seconds: Optional[float] = Field(None, description="Age of the counters in seconds.")
 
 @router.get("/stats", response_model=StatsSchema)
-async def get_stats(db_session = Depends(get_db)):
+async def get_stats():
     """
     Retrieve aggregated statistics for the dashboard KPI cards.
-    This endpoint uses MongoDB's aggregation framework for efficiency.
+    Served from in-memory counters kept current by the event follower; if they are
+    older than `STATS_MAX_STALENESS_SECONDS`, new events are pulled in first.
     """
-    try:
-        # Define the time window for the last 24 hours
-        twenty_four_hours_ago = datetime.utcnow() - timedelta(days=1)
-
-        # Define aggregation pipelines
-        total_alerts_pipeline = [{"$count": "count"}]
-        alerts_24h_pipeline = [{"$match": {"time": {"$gte": twenty_four_hours_ago}}}, {"$count": "count"}]
-        distinct_people_pipeline = [{"$group": {"_id": "$person_id"}}, {"$count": "count"}]
-        active_cameras_pipeline = [{"$group": {"_id": "$camera_id"}}, {"$count": "count"}]
-
-        # Execute pipelines in parallel
-        total_alerts_task = db_session.alerts_collection.aggregate(total_alerts_pipeline).to_list(length=1)
-        alerts_24h_task = db_session.alerts_collection.aggregate(alerts_24h_pipeline).to_list(length=1)
-        distinct_people_task = db_session.alerts_collection.aggregate(distinct_people_pipeline).to_list(length=1)
-        active_cameras_task = db_session.alerts_collection.aggregate(active_cameras_pipeline).to_list(length=1)
-
-        # Await all results
-        results = await asyncio.gather(
-            total_alerts_task, alerts_24h_task, distinct_people_task, active_cameras_task
-        )
-
-        total_alerts_res, alerts_24h_res, distinct_people_res, active_cameras_res = results
-
-        # Extract counts, defaulting to 0 if no documents are found
-        total_alerts = total_alerts_res[0]["count"] if total_alerts_res else 0
-        alerts_24h = alerts_24h_res[0]["count"] if alerts_24h_res else 0
-        distinct_people = distinct_people_res[0]["count"] if distinct_people_res else 0
-        active_cameras = active_cameras_res[0]["count"] if active_cameras_res else 0
+    async def _stats():
+        await event_follower.ensure_fresh(settings.STATS_MAX_STALENESS_SECONDS)
+        return {**stats_engine.snapshot(), "as_of": event_follower.last_poll}
 
-        return {
-            "total_alerts": total_alerts,
-            "alerts_24h": alerts_24h,
-            "distinct_people": distinct_people,
-            "active_cameras": active_cameras,
-        }
+    try:
+        stats = await result_cache.get_or_compute(cache_key("stats"), _stats)
+        # Measured per response, so a cached snapshot still reports its true age
+        as_of = stats["as_of"]
+        staleness = (datetime.utcnow() - as_of).total_seconds() if as_of else None
+        return {**stats, "staleness_seconds": staleness}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred while fetching stats: {e}")
 
@@ -66,35 +48,43 @@ class TimeSeriesDataPoint(BaseModel):
     """
     time_bucket: datetime = Field(alias="_id")
     count: int
+    breakdown: Optional[Dict[str, int]] = Field(None, description="Per-level or per-camera counts, when requested.")
 
 @router.get("/stats/over-time", response_model=List[TimeSeriesDataPoint])
 async def get_stats_over_time(
     days: int = Query(7, ge=1, le=90, description="Number of past days to aggregate over."),
-    db_session=Depends(get_db)
+    level: Optional[str] = Query(None, description="Only count alerts with this level"),
+    camera_id: Optional[str] = Query(None, description="Only count alerts from this camera"),
+    breakdown: Optional[Literal["level", "camera_id"]] = Query(None, description="Split each point's count by level or camera"),
+    explain: bool = Depends(explain_mode),
 ):
     """
-    Retrieve time-series data for alerts, bucketed automatically.
+    Retrieve time-series data for alerts in about 100 evenly sized buckets.
+    Buckets are merged from pre-counted minute/hour/day rollups rather than
+    scanned from raw events.
     """
-    try:
-        start_date = datetime.utcnow() - timedelta(days=days)
+    if explain:
+        return explain_response(
+            [await event_follower.explain_poll()],
+            note="Buckets are merged from in-memory rollups; the only query is the event follower's poll, "
+                 "run inline when the rollups are older than STATS_MAX_STALENESS_SECONDS.",
+        )
 
-        # This pipeline groups alerts into a maximum of 100 buckets over the specified time range.
-        pipeline = [
-            {"$match": {"time": {"$gte": start_date}}},
-            {
-                "$bucketAuto": {
-                    "groupBy": "$time",
-                    "buckets": 100,
-                    "output": {
-                        "count": {"$sum": 1}
-                    }
-                }
-            },
-            {"$sort": {"_id": 1}}
-        ]
+    async def _series():
+        await event_follower.ensure_fresh(settings.STATS_MAX_STALENESS_SECONDS)
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=days)
+        return time_rollups.series(start_date, end_date, level=level, camera_id=camera_id, breakdown=breakdown)
 
-        results = await db_session.alerts_collection.aggregate(pipeline).to_list(length=None)
-        # The result from $bucketAuto gives _id as an object {min:..., max:...}. We'll take the min.
-        return [{"_id": item["_id"]["min"], "count": item["count"]} for item in results]
+    try:
+        key = cache_key("stats/over-time", days=days, level=level, camera_id=camera_id, breakdown=breakdown)
+        return await result_cache.get_or_compute(key, _series)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred while fetching time-series data: {e}")
+
+@router.get("/stats/debug/cache")
+async def debug_result_cache():
+    """
+    Hit, miss and coalescing counters for the shared endpoint result cache.
+    """
+    return {"result_cache": result_cache.stats()}
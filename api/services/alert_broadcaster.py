@@ -0,0 +1,94 @@
+import asyncio
+from typing import List, Optional, Set
+
+from bson import ObjectId
+from loguru import logger
+
+from api.core.config import settings
+from api.models.alert import AlertSchema
+
+def serialize_alert(event: dict) -> str:
+    """Serialize an alert document the same way the `/alerts` endpoint does."""
+    return AlertSchema.model_validate(event).model_dump_json(by_alias=True)
+
+def alert_matches(event: dict, camera_id: Optional[str], level: Optional[str], person_id: Optional[str]) -> bool:
+    """Whether an alert passes a subscriber's filters; unset filters match everything."""
+    if camera_id and event.get("camera_id") != camera_id:
+        return False
+    if level and event.get("level") != level:
+        return False
+    if person_id and str(event.get("person_id")) != person_id:
+        return False
+    return True
+
+class Subscription:
+    """
+    One connected client: its filters and a bounded queue of
+    (alert id, serialized alert) pairs waiting to be sent.
+    """
+    def __init__(self, camera_id: Optional[str], level: Optional[str], person_id: Optional[str], queue_size: int):
+        self.camera_id = camera_id
+        self.level = level
+        self.person_id = person_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # Set when the client fell too far behind and its queue overflowed
+        self.overflowed = False
+
+    def matches(self, event: dict) -> bool:
+        return alert_matches(event, self.camera_id, self.level, self.person_id)
+
+class AlertBroadcaster:
+    """
+    Fans new alerts out to every connected SSE client.
+    Registered as an event follower consumer, so all clients share the
+    follower's single database cursor; each alert is serialized once per batch
+    no matter how many clients receive it.
+
+    A client whose queue fills up is dropped rather than buffered without bound;
+    it reconnects with Last-Event-ID and replays what it missed from the database.
+    """
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscriptions: Set[Subscription] = set()
+        self.high_water: Optional[ObjectId] = None
+        self.delivered = 0
+        self.dropped = 0
+
+    async def load(self, high_water: Optional[ObjectId]) -> None:
+        """Nothing to rebuild: only events newer than `high_water` are broadcast."""
+        self.high_water = high_water
+
+    def apply(self, events: List[dict]) -> None:
+        """Queue a batch of new events for every subscriber whose filters match."""
+        if events:
+            self.high_water = events[-1]["_id"]
+        if not self.subscriptions:
+            return
+        for event in events:
+            interested = [sub for sub in self.subscriptions if not sub.overflowed and sub.matches(event)]
+            if not interested:
+                continue
+            try:
+                payload = serialize_alert(event)
+            except Exception as e:
+                logger.warning(f"Could not serialize alert {event.get('_id')} for streaming: {e}")
+                continue
+            for sub in interested:
+                try:
+                    sub.queue.put_nowait((event["_id"], payload))
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    sub.overflowed = True
+                    self.dropped += 1
+
+    def subscribe(self, camera_id: Optional[str] = None, level: Optional[str] = None,
+                  person_id: Optional[str] = None) -> Subscription:
+        sub = Subscription(camera_id, level, person_id, self.queue_size)
+        self.subscriptions.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self.subscriptions.discard(sub)
+
+# This object will be imported and used by other parts of the application
+alert_broadcaster = AlertBroadcaster(queue_size=settings.ALERT_STREAM_QUEUE_SIZE)
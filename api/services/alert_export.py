@@ -0,0 +1,63 @@
+import csv
+import io
+from typing import AsyncIterator, List, Optional
+
+from loguru import logger
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pydantic import ValidationError
+
+from api.models.alert import AlertSchema
+
+# Export formats: media type and file extension
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+# Column names as they appear in /alerts responses
+EXPORT_COLUMNS = [field.alias or name for name, field in AlertSchema.model_fields.items()]
+
+async def iter_alert_batches(collection: AsyncIOMotorCollection, query: dict, sort: list,
+                             batch_size: int, limit: Optional[int] = None) -> AsyncIterator[List[AlertSchema]]:
+    """
+    Yield validated alerts matching `query` in lists of up to `batch_size`,
+    pulling one cursor batch from the server at a time, so memory use does not
+    grow with the size of the result. Documents that fail validation are skipped
+    and logged, since a stream can't turn into an error response half way through.
+    """
+    cursor = collection.find(query).sort(sort).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+
+    batch: List[AlertSchema] = []
+    skipped = 0
+    async for doc in cursor:
+        try:
+            batch.append(AlertSchema.model_validate(doc))
+        except ValidationError:
+            skipped += 1
+            continue
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+    if skipped:
+        logger.warning(f"Alert export skipped {skipped} document(s) that failed validation.")
+
+async def export_ndjson(batches: AsyncIterator[List[AlertSchema]]) -> AsyncIterator[str]:
+    """One JSON object per line, as in the `/alerts` response."""
+    async for batch in batches:
+        yield "".join(alert.model_dump_json(by_alias=True) + "\n" for alert in batch)
+
+async def export_csv(batches: AsyncIterator[List[AlertSchema]]) -> AsyncIterator[str]:
+    """A header row, then one row per alert."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    yield buffer.getvalue()
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(alert.model_dump(mode="json", by_alias=True) for alert in batch)
+        yield buffer.getvalue()
@@ -0,0 +1,123 @@
+from datetime import timezone
+from typing import AsyncIterator, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+# pyarrow is optional; without it the Arrow and Parquet exports are unavailable
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+    pc = None
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Only the fields in AlertSchema are read from the database
+ARROW_PROJECTION = {"person_id": 1, "time": 1, "level": 1, "image_id": 1, "camera_id": 1, "message": 1}
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("Arrow export requires pyarrow: pip install pyarrow")
+
+def alert_arrow_schema():
+    """
+    Arrow schema for alerts, using AlertSchema's field names. `time` is a UTC
+    timestamp; ids are normalized to strings.
+    """
+    require_pyarrow()
+    return pa.schema([
+        ("id", pa.string()),
+        ("person_id", pa.string()),
+        ("time", pa.timestamp("ms", tz="UTC")),
+        ("level", pa.string()),
+        ("image_id", pa.string()),
+        ("camera_id", pa.string()),
+        ("message", pa.string()),
+    ])
+
+def _as_str(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+def _as_utc(value):
+    # MongoDB returns naive datetimes that are already in UTC
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+def alerts_to_record_batch(docs: list, schema):
+    """Convert a list of alert documents into one RecordBatch, column by column."""
+    columns = [
+        pa.array([str(doc["_id"]) for doc in docs], pa.string()),
+        pa.array([_as_str(doc.get("person_id")) for doc in docs], pa.string()),
+        pa.array([_as_utc(doc.get("time")) for doc in docs], schema.field("time").type),
+        pa.array([doc.get("level") for doc in docs], pa.string()),
+        pa.array([_as_str(doc.get("image_id")) for doc in docs], pa.string()),
+        pa.array([doc.get("camera_id") for doc in docs], pa.string()),
+        pa.array([doc.get("message") for doc in docs], pa.string()),
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+def with_date_column(batch):
+    """Add a `date` column (the UTC day of `time`) for day-partitioned output."""
+    dates = pc.cast(batch.column("time"), pa.date32())
+    return pa.RecordBatch.from_arrays(batch.columns + [dates], names=batch.schema.names + ["date"])
+
+async def iter_alert_record_batches(collection: AsyncIOMotorCollection, query: dict, sort: list,
+                                    batch_size: int, limit: Optional[int] = None) -> AsyncIterator:
+    """
+    Yield alerts matching `query` as Arrow RecordBatches of up to `batch_size`
+    rows. Reads use a projection and cursor batches of the same size, so only
+    one batch is held in memory at a time.
+    """
+    schema = alert_arrow_schema()
+    cursor = collection.find(query, ARROW_PROJECTION).sort(sort).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+
+    docs = []
+    async for doc in cursor:
+        docs.append(doc)
+        if len(docs) >= batch_size:
+            yield alerts_to_record_batch(docs, schema)
+            docs = []
+    if docs:
+        yield alerts_to_record_batch(docs, schema)
+
+class _ChunkSink:
+    """Write-only file object that hands out whatever was written since the last `take`."""
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        self.position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+async def export_arrow_stream(batches: AsyncIterator) -> AsyncIterator[bytes]:
+    """Encode record batches as an Arrow IPC stream, one chunk per batch."""
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), alert_arrow_schema())
+    yield sink.take()
+    async for batch in batches:
+        writer.write_batch(batch)
+        yield sink.take()
+    writer.close()
+    yield sink.take()
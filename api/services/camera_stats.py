@@ -0,0 +1,112 @@
+import heapq
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+
+from api.db.mongodb import db
+
+class PersonTally:
+    """Detections of one person by one camera."""
+    __slots__ = ("count", "first", "last")
+
+    def __init__(self, count: int = 0, first: Optional[datetime] = None, last: Optional[datetime] = None):
+        self.count = count
+        self.first = first
+        self.last = last
+
+    def add(self, count: int, first: Optional[datetime], last: Optional[datetime]) -> None:
+        self.count += count
+        if first is not None and (self.first is None or first < self.first):
+            self.first = first
+        if last is not None and (self.last is None or last > self.last):
+            self.last = last
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+class CameraStatsView:
+    """
+    Per-camera detection totals and person leaderboards, kept current by the
+    event follower. Every camera holds a tally per person it has seen, so
+    unique-people counts are exact and no endpoint rescans the camera's events.
+    """
+    def __init__(self):
+        # camera_id -> person_id -> tally; events without a person_id tally under None
+        self.cameras: Dict[str, Dict[Optional[str], PersonTally]] = {}
+
+    @staticmethod
+    def load_pipeline(high_water: ObjectId) -> list:
+        """Per (camera, person) totals over events up to `high_water`."""
+        return [
+            {"$match": {"_id": {"$lte": high_water}, "camera_id": {"$nin": [None, ""]}}},
+            {
+                "$group": {
+                    "_id": {"camera_id": "$camera_id", "person_id": "$person_id"},
+                    "count": {"$sum": 1},
+                    "first": {"$min": "$time"},
+                    "last": {"$max": "$time"},
+                }
+            },
+        ]
+
+    async def load(self, high_water: Optional[ObjectId]) -> None:
+        """Rebuild every camera's tallies from events up to `high_water`."""
+        cameras: Dict[str, Dict[Optional[str], PersonTally]] = {}
+        if high_water is not None:
+            async for row in db.alerts_collection.aggregate(self.load_pipeline(high_water), allowDiskUse=True):
+                key = row["_id"]
+                person_id = key.get("person_id") or None
+                people = cameras.setdefault(key["camera_id"], {})
+                people.setdefault(person_id, PersonTally()).add(row["count"], row["first"], row["last"])
+        self.cameras = cameras
+
+    def apply(self, events: List[dict]) -> None:
+        """Count a batch of new events."""
+        for event in events:
+            camera_id = event.get("camera_id")
+            if not camera_id:
+                continue
+            event_time = event.get("time")
+            if not isinstance(event_time, datetime):
+                event_time = None
+            people = self.cameras.setdefault(camera_id, {})
+            people.setdefault(event.get("person_id") or None, PersonTally()).add(1, event_time, event_time)
+
+    def summaries(self) -> List[dict]:
+        """Every camera's totals, busiest first."""
+        result = []
+        for camera_id, people in self.cameras.items():
+            total = PersonTally()
+            for tally in people.values():
+                total.add(tally.count, tally.first, tally.last)
+            result.append({
+                "camera_id": camera_id,
+                "total_detections": total.count,
+                "unique_people": len(people) - (1 if None in people else 0),
+                "first_detection": _iso(total.first),
+                "last_detection": _iso(total.last),
+            })
+        result.sort(key=lambda camera: camera["total_detections"], reverse=True)
+        return result
+
+    def top_people(self, camera_id: str, limit: int) -> List[dict]:
+        """The `limit` people this camera has detected most often."""
+        people = self.cameras.get(camera_id, {})
+        top = heapq.nlargest(
+            limit,
+            ((person_id, tally) for person_id, tally in people.items() if person_id is not None),
+            key=lambda item: item[1].count,
+        )
+        return [
+            {
+                "person_id": person_id,
+                "detection_count": tally.count,
+                "first_detection": _iso(tally.first),
+                "last_detection": _iso(tally.last),
+            }
+            for person_id, tally in top
+        ]
+
+# This object will be imported and used by other parts of the application
+camera_stats_view = CameraStatsView()
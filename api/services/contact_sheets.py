@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import io
+import math
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from PIL import Image
+
+from api.core.config import settings
+from api.core.lru import ByteLRUCache
+from api.core.singleflight import SingleFlight
+from api.db.mongodb import db
+from api.services.thumbnails import get_executor, get_thumbnail_bytes
+
+SHEET_FORMATS = {"jpeg": ("JPEG", "image/jpeg"), "webp": ("WEBP", "image/webp")}
+
+def render_contact_sheet(tiles: List[Optional[bytes]], columns: int, tile_size: int, fmt: str) -> bytes:
+    """
+    Paste thumbnails into a grid of `tile_size` cells, each centred in its cell,
+    and encode the sheet. Missing tiles leave their cell blank.
+    A plain top-level function so it can run in a process pool.
+    """
+    rows = max(1, math.ceil(len(tiles) / columns))
+    sheet = Image.new("RGB", (columns * tile_size, rows * tile_size), (0, 0, 0))
+    for index, data in enumerate(tiles):
+        if not data:
+            continue
+        with Image.open(io.BytesIO(data)) as img:
+            img.thumbnail((tile_size, tile_size))
+            x = (index % columns) * tile_size + (tile_size - img.width) // 2
+            y = (index // columns) * tile_size + (tile_size - img.height) // 2
+            sheet.paste(img.convert("RGB"), (x, y))
+    out = io.BytesIO()
+    sheet.save(out, SHEET_FORMATS[fmt][0], quality=85)
+    return out.getvalue()
+
+async def find_sheet_images(person_id: Optional[str], camera_id: Optional[str], limit: int) -> List[Tuple[str, ObjectId]]:
+    """
+    The most recent images for a person or camera, as (image_id, GridFS file id) pairs,
+    newest first. Alerts whose image is missing from GridFS are skipped.
+    """
+    query = {"image_id": {"$nin": [None, ""]}}
+    if person_id:
+        query["person_id"] = person_id
+    if camera_id:
+        query["camera_id"] = camera_id
+    alerts = await db.alerts_collection.find(query, {"image_id": 1, "_id": 0}).sort("time", -1).limit(limit).to_list(length=limit)
+    image_ids = list(dict.fromkeys(str(alert["image_id"]) for alert in alerts))
+
+    files = db.db[f"{settings.GRIDFS_BUCKET_NAME}.files"]
+    found = {
+        doc["metadata"]["image_id"]: doc["_id"]
+        async for doc in files.find({"metadata.image_id": {"$in": image_ids}}, {"metadata.image_id": 1})
+    }
+    return [(image_id, found[image_id]) for image_id in image_ids if image_id in found]
+
+def sheet_layout(entries: List[Tuple[str, ObjectId]], columns: int, tile_size: int, fmt: str) -> dict:
+    """
+    Describe where each image sits on the sheet. `sheet_id` is a hash of the
+    images and layout, so it changes exactly when the rendered sheet would.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{columns}:{tile_size}:{fmt}".encode())
+    for _, file_id in entries:
+        digest.update(file_id.binary)
+    rows = max(1, math.ceil(len(entries) / columns))
+    return {
+        "sheet_id": digest.hexdigest()[:32],
+        "format": fmt,
+        "columns": columns,
+        "rows": rows,
+        "tile_size": tile_size,
+        "width": columns * tile_size,
+        "height": rows * tile_size,
+        "tiles": [
+            {
+                "image_id": image_id,
+                "x": (index % columns) * tile_size,
+                "y": (index // columns) * tile_size,
+                "width": tile_size,
+                "height": tile_size,
+            }
+            for index, (image_id, _) in enumerate(entries)
+        ],
+    }
+
+# Rendered sheets keyed by sheet_id
+contact_sheet_cache = ByteLRUCache(max_bytes=settings.CONTACT_SHEET_CACHE_MAX_BYTES)
+contact_sheet_flight = SingleFlight()
+
+async def get_contact_sheet(entries: List[Tuple[str, ObjectId]], layout: dict) -> bytes:
+    """Return the rendered sheet for `layout`, rendering it once on a cache miss."""
+    sheet_id = layout["sheet_id"]
+    cached = contact_sheet_cache.get(sheet_id)
+    if cached is not None:
+        return cached
+
+    async def _render() -> bytes:
+        bucket_name = settings.GRIDFS_BUCKET_NAME
+        # Bound concurrent thumbnail fetches so one sheet can't monopolise the pool
+        semaphore = asyncio.Semaphore(settings.THUMBNAIL_WORKERS * 2)
+
+        async def fetch(file_id: ObjectId) -> Optional[bytes]:
+            async with semaphore:
+                try:
+                    return await get_thumbnail_bytes(db.db, file_id, bucket_name, f"{bucket_name}_thumbnails")
+                except Exception:
+                    return None
+
+        tiles = await asyncio.gather(*(fetch(file_id) for _, file_id in entries))
+        sheet = await asyncio.get_running_loop().run_in_executor(
+            get_executor(), render_contact_sheet, list(tiles), layout["columns"], layout["tile_size"], layout["format"]
+        )
+        contact_sheet_cache.put(sheet_id, sheet)
+        return sheet
+
+    return await contact_sheet_flight.do(sheet_id, _render)
@@ -0,0 +1,135 @@
+import asyncio
+import io
+from typing import Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+from PIL import Image
+
+from api.core.config import settings
+from api.core.disk_cache import image_disk_cache
+from api.core.lru import ByteLRUCache
+from api.core.singleflight import SingleFlight
+from api.services.thumbnails import get_executor
+
+# Bounding-box edges, in pixels, that derivatives are rendered at. Requested
+# sizes are rounded up to one of these so the cache holds a handful of
+# variants per image rather than one per viewport.
+DERIVATIVE_SIZES = (64, 200, 640, 1280)
+
+# Output formats in order of preference: (Pillow format, content type, encoder options)
+DERIVATIVE_FORMATS = {
+    "avif": ("AVIF", "image/avif", {"quality": 60, "speed": 8}),
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+Image.init()
+# Formats this Pillow build can encode (AVIF needs Pillow 11.3+ built with libavif)
+SUPPORTED_FORMATS = [name for name, (pil_format, _, _) in DERIVATIVE_FORMATS.items() if pil_format in Image.SAVE]
+
+def derivative_size(requested: int) -> int:
+    """The smallest derivative size covering `requested` pixels, or the largest one."""
+    for size in DERIVATIVE_SIZES:
+        if size >= requested:
+            return size
+    return DERIVATIVE_SIZES[-1]
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """
+    Pick the most preferred supported format that the `Accept` header lists,
+    falling back to JPEG. Browsers name AVIF and WebP explicitly when they can
+    decode them, so wildcards are not taken as support.
+    """
+    accepted = {}
+    for part in (accept or "").split(","):
+        media_type, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[media_type.strip().lower()] = quality
+
+    for name in SUPPORTED_FORMATS:
+        if accepted.get(DERIVATIVE_FORMATS[name][1], 0) > 0:
+            return name
+    return "jpeg"
+
+def render_derivative(data: bytes, size: int, fmt: str) -> bytes:
+    """
+    Decode an image, shrink it to fit a `size` box and encode it as `fmt`.
+    JPEG originals are decoded in draft mode, which lets libjpeg scale by 1/2,
+    1/4 or 1/8 while decoding instead of inflating every full-resolution pixel.
+    A plain top-level function so it can run in a process pool.
+    """
+    pil_format, _, options = DERIVATIVE_FORMATS[fmt]
+    with Image.open(io.BytesIO(data)) as img:
+        # Decode at no less than twice the target so the final resample still antialiases
+        img.draft("RGB", (size * 2, size * 2))
+        img.thumbnail((size, size))
+        mode = "RGBA" if pil_format != "JPEG" and "A" in img.getbands() else "RGB"
+        out = io.BytesIO()
+        img.convert(mode).save(out, pil_format, **options)
+        return out.getvalue()
+
+def derivative_etag(file_id: ObjectId, size: int, fmt: str) -> str:
+    """Strong ETag for a derivative: originals are immutable, so id, size and format identify it."""
+    return f'"{file_id}-{size}.{fmt}"'
+
+def derivative_filename(file_id: ObjectId, size: int, fmt: str) -> str:
+    return f"{file_id}_{size}.{fmt}"
+
+# Derivative bytes keyed by (original file id, size, format); entries never need
+# invalidating, only evicting
+derivative_cache = ByteLRUCache(max_bytes=settings.DERIVATIVE_CACHE_MAX_BYTES)
+# Concurrent requests for the same missing derivative share one render
+derivative_flight = SingleFlight()
+
+async def get_derivative_bytes(database: AsyncIOMotorDatabase, file_id: ObjectId, size: int, fmt: str,
+                               bucket_name: str) -> bytes:
+    """
+    Return a derivative's bytes from the in-process cache, else the disk cache,
+    else the GridFS derivatives bucket (`<bucket_name>_derivatives`), else by
+    rendering it from the original and storing it there.
+    """
+    key = (file_id, size, fmt)
+    cached = derivative_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async def _load() -> bytes:
+        filename = derivative_filename(file_id, size, fmt)
+        disk_key = f"{bucket_name}_derivatives/{filename}"
+        if image_disk_cache is not None:
+            data = await asyncio.to_thread(image_disk_cache.read, disk_key)
+            if data is not None:
+                derivative_cache.put(key, data)
+                return data
+
+        derivative_bucket = AsyncIOMotorGridFSBucket(database, bucket_name=f"{bucket_name}_derivatives")
+        # GridFS keeps a (filename, uploadDate) index, so this lookup needs no index of its own
+        existing = await database[f"{bucket_name}_derivatives.files"].find_one({"filename": filename}, {"_id": 1})
+        if existing:
+            stream = await derivative_bucket.open_download_stream(existing["_id"])
+            data = await stream.read()
+        else:
+            original = io.BytesIO()
+            await AsyncIOMotorGridFSBucket(database, bucket_name=bucket_name).download_to_stream(file_id, original)
+            data = await asyncio.get_running_loop().run_in_executor(
+                get_executor(), render_derivative, original.getvalue(), size, fmt
+            )
+            await derivative_bucket.upload_from_stream(
+                filename,
+                io.BytesIO(data),
+                metadata={"original_id": file_id, "size": size, "format": fmt, "contentType": DERIVATIVE_FORMATS[fmt][1]},
+            )
+        derivative_cache.put(key, data)
+        if image_disk_cache is not None:
+            await asyncio.to_thread(image_disk_cache.put, disk_key, data, {"content_type": DERIVATIVE_FORMATS[fmt][1]})
+        return data
+
+    return await derivative_flight.do(key, _load)
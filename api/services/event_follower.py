@@ -0,0 +1,170 @@
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Protocol
+
+from bson import ObjectId
+from loguru import logger
+
+from api.db.mongodb import db
+from api.db.explain import explain_find_report
+from api.core.config import settings
+
+class EventConsumer(Protocol):
+    """
+    Anything that keeps derived state over the alerts collection.
+    `load` builds the state from every event up to and including `high_water`;
+    `apply` folds in a batch of newer events, in `_id` order.
+    """
+    async def load(self, high_water: Optional[ObjectId]) -> None: ...
+    def apply(self, events: List[dict]) -> None: ...
+
+class EventFollower:
+    """
+    Tails new documents in the alerts collection by polling for `_id` values above
+    a high-water mark, and hands each batch to the registered consumers.
+    One follower per process means one database cursor no matter how many
+    consumers or clients depend on it.
+
+    ObjectIds are only roughly monotonic across writers, so an event written by a
+    lagging client can be missed; consumers that care resync on `resync_interval`.
+    A consumer whose `apply` raises may hold half a batch, so it is reloaded at
+    the new high-water mark instead of replaying the batch to everyone.
+    """
+    def __init__(self, poll_interval: float, resync_interval: float, batch_size: int = 1000):
+        self.poll_interval = poll_interval
+        self.resync_interval = resync_interval
+        self.batch_size = batch_size
+        self.consumers: List[EventConsumer] = []
+        # Consumers whose state can't be trusted until they are loaded again
+        self.needs_load: List[EventConsumer] = []
+        self.high_water: Optional[ObjectId] = None
+        self.last_poll: Optional[datetime] = None
+        self.last_resync: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, consumer: EventConsumer) -> None:
+        """Add a consumer. Must be called before `start`."""
+        self.consumers.append(consumer)
+
+    @property
+    def staleness(self) -> Optional[float]:
+        """Seconds since the last successful poll, or None if never polled."""
+        if self.last_poll is None:
+            return None
+        return (datetime.utcnow() - self.last_poll).total_seconds()
+
+    async def resync(self) -> None:
+        """
+        Rebuild every consumer from scratch at the current high-water mark.
+        """
+        async with self._lock:
+            latest = await db.alerts_collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+            high_water = latest["_id"] if latest else None
+            for consumer in self.consumers:
+                await consumer.load(high_water)
+            self.high_water = high_water
+            self.needs_load = []
+            self.last_poll = self.last_resync = datetime.utcnow()
+        logger.info(f"Event follower synced {len(self.consumers)} consumer(s) at {high_water}.")
+
+    @staticmethod
+    def poll_query(high_water: Optional[ObjectId]) -> dict:
+        """Filter for the events newer than `high_water`."""
+        return {"_id": {"$gt": high_water}} if high_water else {}
+
+    async def poll(self) -> int:
+        """
+        Fetch events newer than the high-water mark and apply them to every consumer.
+        Returns the number of new events.
+        """
+        async with self._lock:
+            started = datetime.utcnow()
+            query = self.poll_query(self.high_water)
+            total = 0
+            while True:
+                events = await db.alerts_collection.find(query).sort("_id", 1).limit(self.batch_size).to_list(length=self.batch_size)
+                if not events:
+                    break
+                for consumer in self.consumers:
+                    if consumer in self.needs_load:
+                        continue
+                    try:
+                        consumer.apply(events)
+                    except Exception as e:
+                        logger.error(f"{type(consumer).__name__} could not apply new events, reloading it: {e}")
+                        self.needs_load.append(consumer)
+                self.high_water = events[-1]["_id"]
+                query = {"_id": {"$gt": self.high_water}}
+                total += len(events)
+                if len(events) < self.batch_size:
+                    break
+            await self._reload_failed()
+            self.last_poll = started
+        return total
+
+    async def _reload_failed(self) -> None:
+        """Rebuild the consumers whose `apply` failed; any that fail again are retried next poll."""
+        for consumer in list(self.needs_load):
+            try:
+                await consumer.load(self.high_water)
+                self.needs_load.remove(consumer)
+            except Exception as e:
+                logger.error(f"Reloading {type(consumer).__name__} failed: {e}")
+
+    async def explain_poll(self) -> dict:
+        """Explain the query the next `poll` will run, under `executionStats`."""
+        return await explain_find_report(
+            "event follower poll", db.alerts_collection, self.poll_query(self.high_water), [("_id", 1)], limit=self.batch_size
+        )
+
+    async def ensure_fresh(self, max_staleness: float) -> None:
+        """Poll inline if the consumers are older than `max_staleness` seconds."""
+        if self._lock.locked():
+            # Another request is already syncing; its result is fresh enough
+            async with self._lock:
+                return
+        staleness = self.staleness
+        if staleness is None:
+            await self.resync()
+        elif staleness > max_staleness:
+            await self.poll()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if (datetime.utcnow() - self.last_resync).total_seconds() > self.resync_interval:
+                    await self.resync()
+                else:
+                    await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event follower poll failed: {e}")
+
+    async def start(self) -> None:
+        """Load every consumer and start the background polling task."""
+        try:
+            await self.resync()
+        except Exception as e:
+            # Consumers resync lazily on first use if the initial load fails
+            logger.error(f"Initial event follower sync failed: {e}")
+            self.last_resync = datetime.utcnow()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the background polling task."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# This object will be imported and used by other parts of the application
+event_follower = EventFollower(
+    poll_interval=settings.EVENT_POLL_INTERVAL_SECONDS,
+    resync_interval=settings.EVENT_RESYNC_INTERVAL_SECONDS,
+)
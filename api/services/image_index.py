@@ -0,0 +1,223 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from bson import ObjectId
+from loguru import logger
+
+from api.core.config import settings
+from api.db.mongodb import db
+
+class ImageRecord(NamedTuple):
+    file_id: ObjectId
+    thumb_id: Optional[ObjectId]
+    length: int
+    content_type: str
+
+FILE_PROJECTION = {"_id": 1, "metadata.image_id": 1, "metadata.contentType": 1, "length": 1, "filename": 1}
+
+def _content_type(doc: dict) -> str:
+    content_type = (doc.get("metadata") or {}).get("contentType")
+    if content_type:
+        return content_type
+    filename = doc.get("filename") or ""
+    return "image/png" if filename.lower().endswith(".png") else "image/jpeg"
+
+class ImageResolver:
+    """
+    Maps alert `image_id`s to their GridFS original and cached thumbnail, so the
+    by-image-id endpoints stop looking both up on every request.
+    Holds at most `max_entries` records, least recently used evicted first.
+    The newest files are loaded in bulk on startup; files and thumbnails added
+    later are picked up by polling both buckets above their high-water marks.
+    Anything else is looked up on first use and remembered. While polling is on,
+    image_ids with no file are remembered too (at most `max_missing`) until the
+    next poll finds new files.
+    """
+    def __init__(self, bucket_name: str, max_entries: int, refresh_interval: float, batch_size: int = 1000,
+                 max_missing: int = 1024):
+        self.bucket_name = bucket_name
+        self.thumb_bucket_name = f"{bucket_name}_thumbnails"
+        self.max_entries = max_entries
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size
+        self.max_missing = max_missing
+        self.files_high_water: Optional[ObjectId] = None
+        self.thumbs_high_water: Optional[ObjectId] = None
+        self.hits = 0
+        self.misses = 0
+        self._records: "OrderedDict[str, ImageRecord]" = OrderedDict()
+        # file_id -> every key it is indexed under, to attach thumbnails as they appear
+        self._by_file: Dict[ObjectId, Set[str]] = {}
+        # image_ids known to have no file, as of the last new file seen
+        self._missing: "OrderedDict[str, None]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def _files(self):
+        return db.db[f"{self.bucket_name}.files"]
+
+    @property
+    def _thumbs(self):
+        return db.db[f"{self.thumb_bucket_name}.files"]
+
+    def _unlink(self, image_id: str, file_id: ObjectId) -> None:
+        keys = self._by_file.get(file_id)
+        if keys is not None:
+            keys.discard(image_id)
+            if not keys:
+                del self._by_file[file_id]
+
+    def _store(self, image_id: str, record: ImageRecord) -> None:
+        previous = self._records.pop(image_id, None)
+        if previous is not None:
+            self._unlink(image_id, previous.file_id)
+        self._records[image_id] = record
+        self._by_file.setdefault(record.file_id, set()).add(image_id)
+        while len(self._records) > self.max_entries:
+            evicted_id, evicted = self._records.popitem(last=False)
+            self._unlink(evicted_id, evicted.file_id)
+
+    def _note_missing(self, image_id: str) -> None:
+        if self.refresh_interval <= 0 or self.max_missing <= 0:
+            # Nothing would ever clear it
+            return
+        self._missing[image_id] = None
+        self._missing.move_to_end(image_id)
+        while len(self._missing) > self.max_missing:
+            self._missing.popitem(last=False)
+
+    async def _thumb_ids(self, file_ids: List[ObjectId]) -> Dict[ObjectId, ObjectId]:
+        if not file_ids:
+            return {}
+        cursor = self._thumbs.find({"metadata.original_id": {"$in": file_ids}}, {"metadata.original_id": 1})
+        return {doc["metadata"]["original_id"]: doc["_id"] async for doc in cursor}
+
+    async def _add_files(self, docs: List[dict]) -> None:
+        """Index a batch of file documents, finding their thumbnails with one query."""
+        thumbs = await self._thumb_ids([doc["_id"] for doc in docs])
+        for doc in docs:
+            image_id = (doc.get("metadata") or {}).get("image_id")
+            if image_id:
+                record = ImageRecord(doc["_id"], thumbs.get(doc["_id"]), doc.get("length", 0), _content_type(doc))
+                self._store(str(image_id), record)
+
+    def note_thumbnail(self, file_id: ObjectId, thumb_id: ObjectId) -> None:
+        """Attach a newly stored thumbnail to its original's records, if indexed."""
+        for image_id in self._by_file.get(file_id, ()):
+            self._records[image_id] = self._records[image_id]._replace(thumb_id=thumb_id)
+
+    async def resolve(self, image_id: str) -> Optional[ImageRecord]:
+        """
+        The record for an alert's image_id, or None if there is no such image.
+        Alerts that store the GridFS file id itself as their image_id resolve too.
+        """
+        record = self._records.get(image_id)
+        if record is not None:
+            self._records.move_to_end(image_id)
+            self.hits += 1
+            return record
+        if image_id in self._missing:
+            self.hits += 1
+            return None
+
+        self.misses += 1
+        doc = await self._files.find_one({"metadata.image_id": image_id}, FILE_PROJECTION)
+        if doc is None and ObjectId.is_valid(image_id):
+            doc = await self._files.find_one({"_id": ObjectId(image_id)}, FILE_PROJECTION)
+        if doc is None:
+            self._note_missing(image_id)
+            return None
+        thumbs = await self._thumb_ids([doc["_id"]])
+        record = ImageRecord(doc["_id"], thumbs.get(doc["_id"]), doc.get("length", 0), _content_type(doc))
+        self._store(image_id, record)
+        return record
+
+    async def load(self) -> None:
+        """Index the newest `max_entries` files and note where both buckets end."""
+        latest_thumb = await self._thumbs.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        docs = await self._files.find({}, FILE_PROJECTION).sort("_id", -1).limit(self.max_entries).to_list(length=self.max_entries)
+        # Oldest first, so the newest images end up most recently used
+        docs.reverse()
+        for start in range(0, len(docs), self.batch_size):
+            await self._add_files(docs[start:start + self.batch_size])
+        self.files_high_water = docs[-1]["_id"] if docs else None
+        self.thumbs_high_water = latest_thumb["_id"] if latest_thumb else None
+        logger.info(f"Image index loaded {len(self._records)} image(s).")
+
+    async def refresh(self) -> int:
+        """Index files and thumbnails added since the last load or refresh. Returns how many files were new."""
+        added = 0
+        while True:
+            query = {"_id": {"$gt": self.files_high_water}} if self.files_high_water else {}
+            docs = await self._files.find(query, FILE_PROJECTION).sort("_id", 1).limit(self.batch_size).to_list(length=self.batch_size)
+            if not docs:
+                break
+            await self._add_files(docs)
+            self.files_high_water = docs[-1]["_id"]
+            added += len(docs)
+            if len(docs) < self.batch_size:
+                break
+        if added:
+            # Any of them may be an image that was missing
+            self._missing.clear()
+
+        # Thumbnails rendered since, by this worker or any other
+        while True:
+            query = {"_id": {"$gt": self.thumbs_high_water}} if self.thumbs_high_water else {}
+            thumbs = await self._thumbs.find(query, {"metadata.original_id": 1}).sort("_id", 1).limit(self.batch_size).to_list(length=self.batch_size)
+            if not thumbs:
+                break
+            for thumb in thumbs:
+                original_id = (thumb.get("metadata") or {}).get("original_id")
+                if original_id is not None:
+                    self.note_thumbnail(original_id, thumb["_id"])
+            self.thumbs_high_water = thumbs[-1]["_id"]
+            if len(thumbs) < self.batch_size:
+                break
+        return added
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Image index refresh failed: {e}")
+
+    async def start(self) -> None:
+        """Load the index and start polling for new files."""
+        try:
+            await self.load()
+        except Exception as e:
+            # Lookups still work, one miss at a time
+            logger.error(f"Initial image index load failed: {e}")
+        if self.refresh_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._records),
+            "max_entries": self.max_entries,
+            "missing_entries": len(self._missing),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+# This object will be imported and used by other parts of the application
+image_resolver = ImageResolver(
+    bucket_name=settings.GRIDFS_BUCKET_NAME,
+    max_entries=settings.IMAGE_INDEX_MAX_ENTRIES,
+    refresh_interval=settings.IMAGE_INDEX_REFRESH_SECONDS,
+)
@@ -0,0 +1,250 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from bson import ObjectId
+from loguru import logger
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from api.core.config import settings
+from api.db.mongodb import db
+
+# Checkpoints for server-side derived collections live in one small collection
+STATE_COLLECTION_NAME = "derived_state"
+STATE_ID = "person_summary"
+# How long a lease on the summaries lasts unless renewed. Its holder renews it
+# while working, so it only runs out when that process has died.
+CLAIM_SECONDS = 60
+
+def summary_group_stage() -> dict:
+    """The per-person `$group` stage shared by the rebuild and the deltas."""
+    return {
+        "$group": {
+            "_id": "$person_id",
+            "alert_count": {"$sum": 1},
+            "first_seen": {"$min": "$time"},
+            "last_seen": {"$max": "$time"},
+            "image_count": {"$sum": {"$cond": [{"$ifNull": ["$image_id", False]}, 1, 0]}},
+            "sample_image_id": {"$first": "$image_id"},
+            "cameras": {"$addToSet": "$camera_id"},
+            "levels": {"$addToSet": "$level"},
+        }
+    }
+
+# How a delta row is folded into an existing summary document by `$merge`
+_MERGE_EXISTING = [
+    {
+        "$set": {
+            "alert_count": {"$add": ["$alert_count", "$$new.alert_count"]},
+            "first_seen": {"$min": ["$first_seen", "$$new.first_seen"]},
+            "last_seen": {"$max": ["$last_seen", "$$new.last_seen"]},
+            "image_count": {"$add": ["$image_count", "$$new.image_count"]},
+            "sample_image_id": {"$ifNull": ["$sample_image_id", "$$new.sample_image_id"]},
+            "cameras": {"$setUnion": ["$cameras", "$$new.cameras"]},
+            "levels": {"$setUnion": ["$levels", "$$new.levels"]},
+        }
+    }
+]
+
+class PersonSummaryView:
+    """
+    Maintains the `person_summary` collection: one document per person_id with
+    the counts, first/last sighting and camera/level sets the people endpoints
+    serve. Kept current by folding in events past a checkpoint `_id`.
+
+    Several API processes may run the updater, and the rebuild script may run
+    beside them. Whoever writes the summaries first takes a lease on the
+    checkpoint document; the checkpoint only advances once the merge has
+    succeeded, and a failed merge gives the lease back so the range is retried.
+    A process that dies mid-merge holds the lease until it expires.
+    """
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.last_update: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self):
+        return db.db[settings.PERSON_SUMMARY_COLLECTION_NAME]
+
+    @property
+    def state(self):
+        return db.db[STATE_COLLECTION_NAME]
+
+    async def create_indexes(self) -> None:
+        """Indexes for the people list sorts; `_id` is the person_id."""
+        for field in ("last_seen", "first_seen", "alert_count"):
+            await self.collection.create_index([(field, -1), ("_id", -1)])
+
+    async def _claim(self) -> Optional[dict]:
+        """
+        Take the lease on the summaries. Returns the checkpoint document with our
+        `claimed_by` token, or None if another process holds an unexpired lease.
+        The document has no `last_id` yet if no rebuild has ever run.
+        """
+        now = datetime.utcnow()
+        try:
+            return await self.state.find_one_and_update(
+                {"_id": STATE_ID, "$or": [{"claimed_until": None}, {"claimed_until": {"$lt": now}}]},
+                {"$set": {"claimed_by": ObjectId(), "claimed_until": now + timedelta(seconds=CLAIM_SECONDS)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # The document exists and is claimed, so the upsert tried to insert it
+            return None
+
+    async def _release(self, token: ObjectId, **fields) -> None:
+        """Give the lease back, setting `fields` (such as a new `last_id`) in the same write."""
+        released = await self.state.update_one(
+            {"_id": STATE_ID, "claimed_by": token},
+            {"$set": {"claimed_by": None, "claimed_until": None, **fields}},
+        )
+        if released.modified_count != 1:
+            logger.warning("Person summary lease expired before it was released; another process may repeat this work.")
+
+    async def _renew(self, token: ObjectId) -> None:
+        while True:
+            await asyncio.sleep(CLAIM_SECONDS / 3)
+            try:
+                await self.state.update_one(
+                    {"_id": STATE_ID, "claimed_by": token},
+                    {"$set": {"claimed_until": datetime.utcnow() + timedelta(seconds=CLAIM_SECONDS)}},
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Could not renew the person summary lease: {e}")
+
+    async def _holding(self, token: ObjectId, work):
+        """
+        Await `work` while keeping the lease renewed. If it fails, the lease is
+        released with the checkpoint unchanged, so the next attempt covers the same range.
+        """
+        renewal = asyncio.create_task(self._renew(token))
+        try:
+            return await work
+        except BaseException:
+            renewal.cancel()
+            await self._abandon(token)
+            raise
+        finally:
+            renewal.cancel()
+
+    async def _abandon(self, token: ObjectId) -> None:
+        """Release the lease after a failure, leaving the checkpoint where it was."""
+        try:
+            await self._release(token)
+        except Exception as e:
+            # The lease runs out on its own
+            logger.error(f"Could not release the person summary lease: {e}")
+
+    async def rebuild(self) -> Optional[ObjectId]:
+        """
+        Recompute every summary from the full alerts collection and reset the
+        checkpoint. Used for backfills and when no checkpoint exists yet.
+        Waits for any delta merge in progress to finish first.
+        """
+        state = await self._claim()
+        if state is None:
+            logger.info("Waiting for another process to finish updating the person summaries...")
+            while state is None:
+                await asyncio.sleep(1)
+                state = await self._claim()
+        return await self._rebuild_claimed(state["claimed_by"])
+
+    async def _rebuild_claimed(self, token: ObjectId) -> Optional[ObjectId]:
+        high_water = await self._holding(token, self._recompute())
+        await self._release(token, last_id=high_water)
+        await self.create_indexes()
+        self.last_update = datetime.utcnow()
+        logger.info(f"Rebuilt person summaries up to {high_water}.")
+        return high_water
+
+    async def _recompute(self) -> Optional[ObjectId]:
+        """Replace the summaries with ones built from every alert. Returns the new checkpoint."""
+        latest = await db.alerts_collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        high_water = latest["_id"] if latest else None
+        if high_water is not None:
+            pipeline = [
+                {"$match": {"_id": {"$lte": high_water}, "person_id": {"$ne": None}}},
+                summary_group_stage(),
+                {"$out": settings.PERSON_SUMMARY_COLLECTION_NAME},
+            ]
+            await db.alerts_collection.aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+        return high_water
+
+    async def _merge_since(self, last_id: Optional[ObjectId]) -> Optional[ObjectId]:
+        """Fold events after `last_id` into the summaries. Returns the new checkpoint."""
+        latest = await db.alerts_collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        if latest is None or (last_id is not None and latest["_id"] <= last_id):
+            return last_id
+        high_water = latest["_id"]
+
+        id_range = {"$lte": high_water}
+        if last_id is not None:
+            id_range["$gt"] = last_id
+        pipeline = [
+            {"$match": {"_id": id_range, "person_id": {"$ne": None}}},
+            {"$sort": {"_id": 1}},
+            summary_group_stage(),
+            {
+                "$merge": {
+                    "into": settings.PERSON_SUMMARY_COLLECTION_NAME,
+                    "on": "_id",
+                    "whenMatched": _MERGE_EXISTING,
+                    "whenNotMatched": "insert",
+                }
+            },
+        ]
+        await db.alerts_collection.aggregate(pipeline).to_list(length=None)
+        return high_water
+
+    async def update(self) -> bool:
+        """
+        Fold events newer than the checkpoint into the summaries.
+        Returns False if another process is updating or rebuilding them.
+        """
+        state = await self._claim()
+        if state is None:
+            return False
+        token = state["claimed_by"]
+        if "last_id" not in state:
+            await self._rebuild_claimed(token)
+            return True
+
+        high_water = await self._holding(token, self._merge_since(state["last_id"]))
+        await self._release(token, last_id=high_water)
+        self.last_update = datetime.utcnow()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.update()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Person summary update failed: {e}")
+
+    async def start(self) -> None:
+        """Bring the summaries up to date and keep them there in the background."""
+        try:
+            await self.update()
+        except Exception as e:
+            logger.error(f"Initial person summary update failed: {e}")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# This object will be imported and used by other parts of the application
+person_summary_view = PersonSummaryView(interval=settings.PERSON_SUMMARY_REFRESH_SECONDS)
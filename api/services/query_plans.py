@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from loguru import logger
+
+from api.core.config import settings
+from api.core.pagination import encode_cursor, keyset_filter
+from api.db.mongodb import db
+from api.db.explain import explain_aggregate, explain_find, plan_stages
+from api.routers.alerts import ALERTS_SORT, build_alert_query
+from api.routers.images import image_ids_query
+from api.routers.people import DEFAULT_IMAGE_IDS_LIMIT, PEOPLE_SORT_FIELDS, build_people_pipeline, person_image_ids_query, person_images_query
+from api.services.camera_stats import CameraStatsView
+from api.services.event_follower import EventFollower
+from api.services.person_summary import person_summary_view
+from api.services.rollups import GRANULARITIES, TimeRollups, floor_time
+from api.services.stats_engine import WINDOW_24H, StatsEngine
+
+# Plan stages that mean a query is not fully served by an index
+PROBLEM_STAGES = {"COLLSCAN", "SORT"}
+
+def query_shapes() -> list:
+    """
+    The query shapes the routers, and the services behind them, send to MongoDB,
+    built by the same functions that build the real queries.
+    Each entry is (name, collection, "find", (filter, sort)) or (name, collection, "aggregate", pipeline).
+    Values are placeholders: only the shape matters to the planner.
+    """
+    now = datetime.utcnow()
+    day_ago = now - timedelta(days=1)
+    high_water = ObjectId()
+    alerts_collection = db.alerts_collection
+    files = db.db[f"{settings.GRIDFS_BUCKET_NAME}.files"]
+
+    def alerts(**filters):
+        return build_alert_query(**filters), ALERTS_SORT
+
+    keyset_query = build_alert_query(camera_id="")
+    keyset_query.update(keyset_filter("time", encode_cursor(now, ObjectId())))
+
+    shapes = [
+        ("alerts", alerts_collection, "find", alerts()),
+        ("alerts?level", alerts_collection, "find", alerts(level="")),
+        ("alerts?camera_id", alerts_collection, "find", alerts(camera_id="")),
+        ("alerts?person_id", alerts_collection, "find", alerts(person_id="")),
+        ("alerts?start_time&end_time", alerts_collection, "find", alerts(start_time=day_ago, end_time=now)),
+        ("alerts?camera_id&start_time", alerts_collection, "find", alerts(camera_id="", start_time=day_ago)),
+        ("alerts?camera_id&cursor", alerts_collection, "find", (keyset_query, ALERTS_SORT)),
+        ("people/{id}/images", alerts_collection, "find", person_images_query("")),
+        ("people/{id} image_ids", alerts_collection, "find", person_image_ids_query("")),
+        ("images/by-image-ids", files, "find", (image_ids_query([""]), None)),
+        ("event follower poll", alerts_collection, "find", (EventFollower.poll_query(high_water), [("_id", 1)])),
+        ("stats load alerts_24h", alerts_collection, "find", StatsEngine.window_query(high_water, now - WINDOW_24H)),
+        ("camera stats load", alerts_collection, "aggregate", CameraStatsView.load_pipeline(high_water)),
+    ]
+    for name, width, retention in GRANULARITIES:
+        pipeline = TimeRollups.load_pipeline(high_water, width, floor_time(now - retention, width))
+        shapes.append((f"rollups load ({name})", alerts_collection, "aggregate", pipeline))
+    for sort in PEOPLE_SORT_FIELDS:
+        pipeline = build_people_pipeline(100, sort, "desc", DEFAULT_IMAGE_IDS_LIMIT, alerts_collection.name)
+        shapes.append((f"people?sort={sort}", person_summary_view.collection, "aggregate", pipeline))
+    return shapes
+
+async def report_query_plans():
+    """
+    Explain every query shape the routers emit and log the ones whose winning plan
+    contains a collection scan or an in-memory sort.
+    Runs with `queryPlanner` verbosity, so no query is actually executed.
+    """
+    logger.info("Checking query plans for the routers' query shapes...")
+    flagged = 0
+    for name, collection, kind, spec in query_shapes():
+        try:
+            if kind == "find":
+                query, sort = spec
+                explain = await explain_find(collection, query, sort, limit=20)
+            else:
+                explain = await explain_aggregate(collection, spec)
+        except Exception as e:
+            logger.warning(f"Could not explain query shape '{name}': {e}")
+            continue
+
+        stages = plan_stages(explain)
+        problems = sorted(PROBLEM_STAGES.intersection(stages))
+        if problems:
+            flagged += 1
+            logger.warning(f"Query shape '{name}' uses {', '.join(problems)}: {' <- '.join(stages)}")
+        else:
+            logger.debug(f"Query shape '{name}' is index-backed: {' <- '.join(stages)}")
+
+    if flagged:
+        logger.warning(f"{flagged} query shape(s) are not fully index-backed.")
+    else:
+        logger.info("All query shapes are index-backed.")
@@ -0,0 +1,152 @@
+import math
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+from api.db.mongodb import db
+
+EPOCH = datetime(1970, 1, 1)
+
+# (name, bucket width, how long buckets of this width are kept), finest first
+GRANULARITIES = [
+    ("minute", timedelta(minutes=1), timedelta(days=2)),
+    ("hour", timedelta(hours=1), timedelta(days=14)),
+    ("day", timedelta(days=1), timedelta(days=90)),
+]
+
+def floor_time(value: datetime, width: timedelta) -> datetime:
+    """Round a naive UTC datetime down to a multiple of `width` since the epoch."""
+    step = int(width.total_seconds())
+    seconds = int((value - EPOCH).total_seconds())
+    return EPOCH + timedelta(seconds=seconds - seconds % step)
+
+class TimeRollups:
+    """
+    Pre-counted alert buckets at minute, hour and day resolution, each broken down
+    by (level, camera_id). Filled once from the database and then kept current by
+    the event follower, so time-series queries merge a few hundred buckets
+    instead of scanning raw events.
+    """
+    def __init__(self, target_points: int = 100):
+        self.target_points = target_points
+        # granularity -> bucket start -> counts keyed by (level, camera_id)
+        self.buckets: Dict[str, Dict[datetime, Counter]] = {
+            name: defaultdict(Counter) for name, _, _ in GRANULARITIES
+        }
+
+    @staticmethod
+    def load_pipeline(high_water: ObjectId, width: timedelta, since: datetime) -> list:
+        """Counts per `width` bucket, level and camera for events from `since` up to `high_water`."""
+        width_ms = int(width.total_seconds() * 1000)
+        return [
+            {"$match": {"_id": {"$lte": high_water}, "time": {"$gte": since}}},
+            {
+                "$group": {
+                    "_id": {
+                        # Portable date truncation; $dateTrunc needs MongoDB 5.0
+                        "t": {"$subtract": ["$time", {"$mod": [{"$subtract": ["$time", EPOCH]}, width_ms]}]},
+                        "level": "$level",
+                        "camera_id": "$camera_id",
+                    },
+                    "count": {"$sum": 1},
+                }
+            },
+        ]
+
+    async def load(self, high_water: Optional[ObjectId]) -> None:
+        """Rebuild every granularity from events up to `high_water`."""
+        now = datetime.utcnow()
+        buckets = {name: defaultdict(Counter) for name, _, _ in GRANULARITIES}
+        if high_water is not None:
+            for name, width, retention in GRANULARITIES:
+                pipeline = self.load_pipeline(high_water, width, floor_time(now - retention, width))
+                async for row in db.alerts_collection.aggregate(pipeline):
+                    key = row["_id"]
+                    buckets[name][key["t"]][(key.get("level"), key.get("camera_id"))] += row["count"]
+        self.buckets = buckets
+
+    def apply(self, events: List[dict]) -> None:
+        """Count a batch of new events into every granularity."""
+        for event in events:
+            event_time = event.get("time")
+            if not isinstance(event_time, datetime):
+                continue
+            key = (event.get("level"), event.get("camera_id"))
+            for name, width, _ in GRANULARITIES:
+                self.buckets[name][floor_time(event_time, width)][key] += 1
+        self._prune()
+
+    def _prune(self) -> None:
+        """Drop buckets that have aged out of their granularity's retention."""
+        now = datetime.utcnow()
+        for name, width, retention in GRANULARITIES:
+            cutoff = floor_time(now - retention, width)
+            expired = [start for start in self.buckets[name] if start < cutoff]
+            for start in expired:
+                del self.buckets[name][start]
+
+    def choose_granularity(self, span: timedelta) -> Tuple[str, timedelta, timedelta]:
+        """
+        Pick the coarsest retained granularity that still gives about `target_points`
+        points over `span`. Returns its name, its bucket width, and the merged
+        point width to use with it.
+        """
+        target_width = span / self.target_points
+        candidates = [g for g in GRANULARITIES if g[2] >= span]
+        if not candidates:
+            candidates = [GRANULARITIES[-1]]
+        name, width, _ = candidates[0]
+        for candidate in candidates:
+            if candidate[1] <= target_width:
+                name, width, _ = candidate
+        merged_width = width * max(1, math.ceil(target_width / width))
+        return name, width, merged_width
+
+    def series(
+        self,
+        start: datetime,
+        end: datetime,
+        level: Optional[str] = None,
+        camera_id: Optional[str] = None,
+        breakdown: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Merge the pre-counted buckets in [start, end) into evenly sized points;
+        `start` is rounded down to the underlying bucket width.
+        `breakdown` may be "level" or "camera_id" to split each point's count.
+        Only non-empty points are returned, oldest first.
+        """
+        name, base_width, width = self.choose_granularity(end - start)
+        origin = floor_time(start, width)
+        first_base = floor_time(start, base_width)
+
+        points: Dict[datetime, Counter] = defaultdict(Counter)
+        for bucket_start, counts in self.buckets[name].items():
+            if bucket_start < first_base or bucket_start >= end:
+                continue
+            point = origin + width * ((bucket_start - origin) // width)
+            for (event_level, event_camera), count in counts.items():
+                if level and event_level != level:
+                    continue
+                if camera_id and event_camera != camera_id:
+                    continue
+                if breakdown == "level":
+                    points[point][str(event_level)] += count
+                elif breakdown == "camera_id":
+                    points[point][str(event_camera)] += count
+                else:
+                    points[point][None] += count
+
+        result = []
+        for point in sorted(points):
+            counts = points[point]
+            item = {"_id": point, "count": sum(counts.values())}
+            if breakdown:
+                item["breakdown"] = dict(counts)
+            result.append(item)
+        return result
+
+# This object will be imported and used by other parts of the application
+time_rollups = TimeRollups()
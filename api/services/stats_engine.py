@@ -0,0 +1,79 @@
+import asyncio
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+
+from api.db.mongodb import db
+
+WINDOW_24H = timedelta(days=1)
+
+class StatsEngine:
+    """
+    In-memory KPI counters for the dashboard, kept current by the event follower.
+    Built once with the same aggregations `/stats` used to run per request,
+    then updated incrementally from each batch of new events.
+    """
+    def __init__(self):
+        self.total_alerts = 0
+        self.person_ids: set = set()
+        self.camera_ids: set = set()
+        # Sorted event times inside the rolling 24h window
+        self.recent_times: List[datetime] = []
+
+    @staticmethod
+    def window_query(high_water: Optional[ObjectId], since: datetime) -> Tuple[dict, list]:
+        """Filter and sort for the event times inside the 24h window, up to `high_water`."""
+        match = {"_id": {"$lte": high_water}} if high_water else {"_id": None}
+        return {**match, "time": {"$gte": since}}, [("time", 1)]
+
+    async def load(self, high_water: Optional[ObjectId]) -> None:
+        """Recompute every counter from events up to `high_water`."""
+        match = {"_id": {"$lte": high_water}} if high_water else {"_id": None}
+        window, window_sort = self.window_query(high_water, datetime.utcnow() - WINDOW_24H)
+        collection = db.alerts_collection
+
+        total_res, people, cameras, recent = await asyncio.gather(
+            collection.aggregate([{"$match": match}, {"$count": "count"}]).to_list(length=1),
+            collection.aggregate([{"$match": match}, {"$group": {"_id": "$person_id"}}]).to_list(length=None),
+            collection.aggregate([{"$match": match}, {"$group": {"_id": "$camera_id"}}]).to_list(length=None),
+            collection.find(window, {"time": 1, "_id": 0}).sort(window_sort).to_list(length=None),
+        )
+
+        self.total_alerts = total_res[0]["count"] if total_res else 0
+        self.person_ids = {doc["_id"] for doc in people}
+        self.camera_ids = {doc["_id"] for doc in cameras}
+        self.recent_times = [doc["time"] for doc in recent]
+
+    def apply(self, events: List[dict]) -> None:
+        """
+        Fold a batch of new events into the counters.
+        Events without a datetime `time` count everywhere but the 24h window.
+        """
+        since = datetime.utcnow() - WINDOW_24H
+        for event in events:
+            self.total_alerts += 1
+            self.person_ids.add(event.get("person_id"))
+            self.camera_ids.add(event.get("camera_id"))
+            event_time = event.get("time")
+            if isinstance(event_time, datetime) and event_time >= since:
+                insort(self.recent_times, event_time)
+
+    def alerts_24h(self) -> int:
+        """Drop times that have left the window and count the rest."""
+        cutoff = bisect_left(self.recent_times, datetime.utcnow() - WINDOW_24H)
+        if cutoff:
+            del self.recent_times[:cutoff]
+        return len(self.recent_times)
+
+    def snapshot(self) -> dict:
+        return {
+            "total_alerts": self.total_alerts,
+            "alerts_24h": self.alerts_24h(),
+            "distinct_people": len(self.person_ids),
+            "active_cameras": len(self.camera_ids),
+        }
+
+# This object will be imported and used by other parts of the application
+stats_engine = StatsEngine()
@@ -0,0 +1,221 @@
+import asyncio
+import io
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from loguru import logger
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+from PIL import Image
+
+from api.core.config import settings
+from api.core.disk_cache import image_disk_cache
+from api.core.lru import ByteLRUCache
+from api.core.singleflight import SingleFlight
+from api.db.mongodb import db
+from api.services.image_index import image_resolver
+
+THUMBNAIL_SIZE = (200, 200)
+
+def render_thumbnail(data: bytes, size=THUMBNAIL_SIZE, timings: Optional[Dict[str, float]] = None) -> bytes:
+    """
+    Decode an image, shrink it to fit `size` and encode it as JPEG.
+    A plain top-level function so it can run in a process pool.
+    Pass `timings` to have the seconds spent decoding, resizing and encoding added to it.
+    """
+    started = time.perf_counter()
+    with Image.open(io.BytesIO(data)) as img:
+        # Let JPEGs decode at reduced scale (no less than twice the target, as `thumbnail` would)
+        img.draft(None, (size[0] * 2, size[1] * 2))
+        img.load()
+        decoded = time.perf_counter()
+        img.thumbnail(size)
+        resized = time.perf_counter()
+        thumb_io = io.BytesIO()
+        img.convert("RGB").save(thumb_io, "JPEG", quality=90)
+        if timings is not None:
+            timings["decode"] = timings.get("decode", 0.0) + decoded - started
+            timings["resize"] = timings.get("resize", 0.0) + resized - decoded
+            timings["encode"] = timings.get("encode", 0.0) + time.perf_counter() - resized
+        return thumb_io.getvalue()
+
+_executor: Optional[Executor] = None
+
+def get_executor() -> Executor:
+    """Create the render pool on first use, as configured by THUMBNAIL_EXECUTOR."""
+    global _executor
+    if _executor is None:
+        if settings.THUMBNAIL_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.THUMBNAIL_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=settings.THUMBNAIL_WORKERS, thread_name_prefix="thumbnail")
+    return _executor
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+async def render_in_pool(data: bytes) -> bytes:
+    """Run `render_thumbnail` in the worker pool, off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), render_thumbnail, data)
+
+# Concurrent requests for the same uncached thumbnail share one render
+thumbnail_flight = SingleFlight()
+
+async def store_thumbnail(database: AsyncIOMotorDatabase, file_id: ObjectId, thumb_bytes: bytes,
+                          thumb_bucket_name: str) -> ObjectId:
+    """Upload a rendered thumbnail to `thumb_bucket_name`, linked to its original, and return its id."""
+    thumb_bucket = AsyncIOMotorGridFSBucket(database, bucket_name=thumb_bucket_name)
+    thumb_id = await thumb_bucket.upload_from_stream(
+        f"thumb_{file_id}.jpg",
+        io.BytesIO(thumb_bytes),
+        metadata={"original_id": file_id, "contentType": "image/jpeg"}
+    )
+    if thumb_bucket_name == image_resolver.thumb_bucket_name:
+        image_resolver.note_thumbnail(file_id, thumb_id)
+    return thumb_id
+
+async def generate_thumbnail(database: AsyncIOMotorDatabase, file_id: ObjectId,
+                             bucket_name: str, thumb_bucket_name: str) -> bytes:
+    """
+    Render the thumbnail for an original in `bucket_name`, cache it in
+    `thumb_bucket_name` and return its bytes.
+    """
+    async def _generate() -> bytes:
+        main_bucket = AsyncIOMotorGridFSBucket(database, bucket_name=bucket_name)
+
+        original_image_stream = io.BytesIO()
+        await main_bucket.download_to_stream(file_id, original_image_stream)
+        thumb_bytes = await render_in_pool(original_image_stream.getvalue())
+
+        # Cache the thumbnail in GridFS
+        await store_thumbnail(database, file_id, thumb_bytes, thumb_bucket_name)
+        return thumb_bytes
+
+    return await thumbnail_flight.do((thumb_bucket_name, file_id), _generate)
+
+# Thumbnail bytes keyed by (thumbnail bucket, original file id); originals are
+# immutable, so entries never need invalidating, only evicting
+thumbnail_cache = ByteLRUCache(max_bytes=settings.THUMBNAIL_CACHE_MAX_BYTES)
+
+def thumbnail_etag(file_id: ObjectId, thumb_bucket_name: str) -> str:
+    """Strong ETag for a thumbnail: its bucket, the original's id and the render size."""
+    return f'"{thumb_bucket_name}-{file_id}-{THUMBNAIL_SIZE[0]}x{THUMBNAIL_SIZE[1]}"'
+
+async def get_thumbnail_bytes(database: AsyncIOMotorDatabase, file_id: ObjectId,
+                              bucket_name: str, thumb_bucket_name: str,
+                              thumb_id: Optional[ObjectId] = None) -> bytes:
+    """
+    Return a thumbnail's bytes from the in-process cache, else the disk cache,
+    else the GridFS thumbnail bucket, else by rendering it.
+    A known `thumb_id` saves looking the thumbnail up by its original.
+    """
+    key = (thumb_bucket_name, file_id)
+    thumb_bytes = thumbnail_cache.get(key)
+    if thumb_bytes is not None:
+        return thumb_bytes
+
+    disk_key = f"{thumb_bucket_name}/{file_id}"
+    if image_disk_cache is not None:
+        thumb_bytes = await asyncio.to_thread(image_disk_cache.read, disk_key)
+        if thumb_bytes is not None:
+            thumbnail_cache.put(key, thumb_bytes)
+            return thumb_bytes
+
+    if thumb_id is None:
+        existing_thumb = await database[f"{thumb_bucket_name}.files"].find_one({"metadata.original_id": file_id}, {"_id": 1})
+        thumb_id = existing_thumb["_id"] if existing_thumb else None
+    if thumb_id is not None:
+        thumb_bucket = AsyncIOMotorGridFSBucket(database, bucket_name=thumb_bucket_name)
+        try:
+            thumb_stream = await thumb_bucket.open_download_stream(thumb_id)
+            thumb_bytes = await thumb_stream.read()
+        except NoFile:
+            thumb_id = None
+    if thumb_id is None:
+        thumb_bytes = await generate_thumbnail(database, file_id, bucket_name, thumb_bucket_name)
+
+    thumbnail_cache.put(key, thumb_bytes)
+    if image_disk_cache is not None:
+        await asyncio.to_thread(image_disk_cache.put, disk_key, thumb_bytes, {"content_type": "image/jpeg"})
+    return thumb_bytes
+
+class ThumbnailPrewarmer:
+    """
+    Watches the originals bucket for new files and renders their thumbnails
+    before anyone asks for them. Starts from the newest file at startup; older
+    files are left to the lazy path. Renders one file at a time so it never
+    crowds request-time renders out of the pool.
+    """
+    def __init__(self, interval: float, bucket_name: str, batch_size: int = 100):
+        self.interval = interval
+        self.bucket_name = bucket_name
+        self.thumb_bucket_name = f"{bucket_name}_thumbnails"
+        self.batch_size = batch_size
+        self.high_water: Optional[ObjectId] = None
+        self.rendered = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """Render thumbnails for files added since the last run. Returns how many files were scanned."""
+        files = db.db[f"{self.bucket_name}.files"]
+        query = {"_id": {"$gt": self.high_water}} if self.high_water else {}
+        new_files = await files.find(query, {"_id": 1}).sort("_id", 1).limit(self.batch_size).to_list(length=self.batch_size)
+        if not new_files:
+            return 0
+
+        ids: List[ObjectId] = [f["_id"] for f in new_files]
+        existing = await db.db[f"{self.thumb_bucket_name}.files"].find(
+            {"metadata.original_id": {"$in": ids}}, {"metadata.original_id": 1}
+        ).to_list(length=None)
+        done = {doc["metadata"]["original_id"] for doc in existing}
+
+        rendered = 0
+        for file_id in ids:
+            if file_id in done:
+                continue
+            try:
+                await generate_thumbnail(db.db, file_id, self.bucket_name, self.thumb_bucket_name)
+                rendered += 1
+            except Exception as e:
+                logger.warning(f"Could not prewarm thumbnail for {file_id}: {e}")
+        self.high_water = ids[-1]
+        self.rendered += rendered
+        return len(ids)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                # Drain full batches before sleeping again
+                while await self.run_once() == self.batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Thumbnail prewarm failed: {e}")
+
+    async def start(self) -> None:
+        """Record the newest existing file and start watching for new ones."""
+        latest = await db.db[f"{self.bucket_name}.files"].find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        self.high_water = latest["_id"] if latest else None
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# This object will be imported and used by other parts of the application
+thumbnail_prewarmer = ThumbnailPrewarmer(
+    interval=settings.THUMBNAIL_PREWARM_INTERVAL_SECONDS,
+    bucket_name=settings.GRIDFS_BUCKET_NAME,
+)
@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the root of the project to the Python path
+# This allows the script to import modules from the `api` package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+from api.core.config import settings
+from api.db.mongodb import db
+from api.db.mongodb_utils import connect_to_mongo, close_mongo_connection
+from api.services.person_summary import STATE_COLLECTION_NAME
+from api.services.thumbnails import render_thumbnail, store_thumbnail
+
+STATE_ID = "thumbnail_backfill"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render thumbnails for every original that does not have one yet.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Render processes")
+    parser.add_argument("--concurrency", type=int, default=None, help="Images downloaded, rendered or uploaded at once (default: 2 x workers)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Originals scanned per batch; the checkpoint advances once per batch")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after scanning this many originals")
+    parser.add_argument("--restart", action="store_true", help="Ignore the saved checkpoint and scan from the first original")
+    parser.add_argument("--thumb-bucket", default=f"{settings.GRIDFS_BUCKET_NAME}_thumbnails", help="GridFS bucket to write thumbnails to")
+    return parser.parse_args()
+
+class Progress:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.scanned = 0
+        self.rendered = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def line(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.rendered / elapsed if elapsed else 0.0
+        return (f"scanned {self.scanned}, rendered {self.rendered}, already had {self.skipped}, "
+                f"failed {self.failed} ({rate:.1f} images/s, {elapsed:.0f}s)")
+
+async def backfill_batch(files: list, args, pool: ProcessPoolExecutor, semaphore: asyncio.Semaphore, progress: Progress) -> None:
+    """Render and upload thumbnails for the originals in `files` that have none."""
+    ids = [f["_id"] for f in files]
+    existing = await db.db[f"{args.thumb_bucket}.files"].find(
+        {"metadata.original_id": {"$in": ids}}, {"metadata.original_id": 1}
+    ).to_list(length=None)
+    done = {doc["metadata"]["original_id"] for doc in existing}
+    progress.scanned += len(ids)
+    progress.skipped += len(done)
+
+    bucket = AsyncIOMotorGridFSBucket(db.db, bucket_name=settings.GRIDFS_BUCKET_NAME)
+    loop = asyncio.get_running_loop()
+
+    async def backfill_one(file_id) -> None:
+        async with semaphore:
+            try:
+                original = io.BytesIO()
+                await bucket.download_to_stream(file_id, original)
+                thumb_bytes = await loop.run_in_executor(pool, render_thumbnail, original.getvalue())
+                await store_thumbnail(db.db, file_id, thumb_bytes, args.thumb_bucket)
+                progress.rendered += 1
+            except Exception as e:
+                progress.failed += 1
+                print(f"  could not render {file_id}: {e}")
+
+    await asyncio.gather(*(backfill_one(file_id) for file_id in ids if file_id not in done))
+
+async def backfill_thumbnails(args):
+    """
+    Walks the originals bucket in `_id` order and renders a thumbnail for every
+    file that has none, across a process pool. The last fully processed `_id`
+    is saved after each batch, so an interrupted run picks up where it stopped.
+    Failed files are reported and skipped; rerun with --restart to retry them.
+    """
+    concurrency = args.concurrency or args.workers * 2
+    await connect_to_mongo()
+    pool = ProcessPoolExecutor(max_workers=args.workers)
+    state = db.db[STATE_COLLECTION_NAME]
+    try:
+        checkpoint = None
+        if not args.restart:
+            saved = await state.find_one({"_id": STATE_ID, "thumb_bucket": args.thumb_bucket})
+            checkpoint = saved.get("last_id") if saved else None
+        if checkpoint:
+            print(f"Resuming after original {checkpoint}")
+
+        files = db.db[f"{settings.GRIDFS_BUCKET_NAME}.files"]
+        semaphore = asyncio.Semaphore(concurrency)
+        progress = Progress()
+        while args.limit is None or progress.scanned < args.limit:
+            size = args.batch_size if args.limit is None else min(args.batch_size, args.limit - progress.scanned)
+            query = {"_id": {"$gt": checkpoint}} if checkpoint else {}
+            batch = await files.find(query, {"_id": 1}).sort("_id", 1).limit(size).to_list(length=size)
+            if not batch:
+                break
+            await backfill_batch(batch, args, pool, semaphore, progress)
+            checkpoint = batch[-1]["_id"]
+            await state.update_one(
+                {"_id": STATE_ID}, {"$set": {"last_id": checkpoint, "thumb_bucket": args.thumb_bucket}}, upsert=True
+            )
+            print(progress.line())
+        print(f"Done: {progress.line()}")
+    finally:
+        pool.shutdown(cancel_futures=True)
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    # This block allows the script to be run directly
+    asyncio.run(backfill_thumbnails(parse_args()))
@@ -0,0 +1,234 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# Add the root of the project to the Python path
+# This allows the script to import modules from the `api` package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+
+API = "/api/v1"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure API latency and throughput against a seeded benchmark database.")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017", help="Database seeded by scripts/seed_benchmark_data.py")
+    parser.add_argument("--db", default="dfip_benchmark")
+    parser.add_argument("--base-url", default=None, help="Benchmark a running server instead of an in-process app")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per workload")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight per workload")
+    parser.add_argument("--depth", type=int, default=50, help="Page depth for the deep paging workloads")
+    parser.add_argument("--only", nargs="*", default=None, help="Run only workloads whose name contains one of these")
+    parser.add_argument("--output", default=None, help="Results JSON path (default: benchmark-results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to diff p95 latency against")
+    return parser.parse_args()
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return "unknown"
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+async def run_workload(client: httpx.AsyncClient, urls: list, concurrency: int) -> dict:
+    """Request every URL with `concurrency` requests in flight and summarize the latencies."""
+    latencies = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < len(urls):
+            url = urls[next_index]
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await client.get(url)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - started) * 1000)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+async def page_cursor(client: httpx.AsyncClient, path: str, params: dict, depth: int):
+    """Follow `X-Next-Cursor` for `depth` pages and return the cursor of the last one."""
+    cursor = None
+    for _ in range(depth):
+        response = await client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    return cursor
+
+async def build_workloads(client: httpx.AsyncClient, database, args) -> list:
+    """
+    Every workload as (name, list of URLs). Ids come straight from the
+    benchmark database so the URLs hit real documents.
+    """
+    from api.core.config import settings
+
+    async def sample(field: str, limit: int) -> list:
+        rows = await alerts.aggregate([{"$group": {"_id": f"${field}"}}, {"$limit": limit}]).to_list(length=limit)
+        return [row["_id"] for row in rows if row["_id"]]
+
+    n = args.requests
+    alerts = database[settings.ALERTS_COLLECTION_NAME]
+    cameras = await sample("camera_id", 50)
+    people = await sample("person_id", 200)
+    files = await database[f"{settings.GRIDFS_BUCKET_NAME}.files"].find({}, {"_id": 1}).to_list(length=None)
+    file_ids = [str(f["_id"]) for f in files]
+
+    alerts_cursor = await page_cursor(client, f"{API}/alerts", {"page_size": 20}, args.depth)
+    people_cursor = await page_cursor(client, f"{API}/people", {"page_size": 100, "image_ids_limit": 0}, args.depth)
+
+    def cycle(values: list, fmt: str) -> list:
+        return [fmt.format(values[i % len(values)]) for i in range(n)] if values else []
+
+    workloads = [
+        ("alerts page 1", [f"{API}/alerts?page_size=20"] * n),
+        (f"alerts page {args.depth} (skip)", [f"{API}/alerts?page_size=20&page={args.depth}"] * n),
+        (f"alerts page {args.depth} (cursor)", [f"{API}/alerts?page_size=20&cursor={alerts_cursor}"] * n if alerts_cursor else []),
+        ("alerts by camera", cycle(cameras, API + "/alerts?page_size=20&camera_id={}")),
+        ("stats", [f"{API}/stats"] * n),
+        ("stats over-time 7d", [f"{API}/stats/over-time?days=7"] * n),
+        ("stats over-time 90d by level", [f"{API}/stats/over-time?days=90&breakdown=level"] * n),
+        ("people page 1", [f"{API}/people?page_size=100"] * n),
+        (f"people page {args.depth} (cursor)", [f"{API}/people?page_size=100&image_ids_limit=0&cursor={people_cursor}"] * n if people_cursor else []),
+        ("person details", cycle(people, API + "/people/{}")),
+        ("cameras", [f"{API}/cameras"] * n),
+        ("camera people", cycle(cameras, API + "/cameras/{}/people")),
+    ]
+
+    # Cold thumbnails: each original once, with the GridFS thumbnail bucket and the server's caches emptied first.
+    # Warm: the same originals again, now cached.
+    thumbs = file_ids[:n]
+    workloads.append(("thumbnails cold", [f"{API}/images/{file_id}/thumb" for file_id in thumbs]))
+    workloads.append(("thumbnails warm", [f"{API}/images/{thumbs[i % len(thumbs)]}/thumb" for i in range(n)] if thumbs else []))
+    return workloads
+
+async def clear_thumbnails(client: httpx.AsyncClient, database) -> None:
+    """Drop the stored thumbnails and empty the server's image caches."""
+    from api.core.config import settings
+    thumb_bucket_name = f"{settings.GRIDFS_BUCKET_NAME}_thumbnails"
+    await database[f"{thumb_bucket_name}.files"].drop()
+    await database[f"{thumb_bucket_name}.chunks"].drop()
+    response = await client.delete(f"{API}/images/debug/cache")
+    if response.status_code >= 400:
+        print(f"Could not clear the server's image caches ({response.status_code}); "
+              "'thumbnails cold' will hit them. Start the server with IMAGE_CACHE_CLEAR_ENABLED=true.")
+
+async def run_benchmarks(args, client: httpx.AsyncClient, database) -> dict:
+    from api.core.config import settings
+
+    results = []
+    workloads = await build_workloads(client, database, args)
+    for name, urls in workloads:
+        if args.only and not any(term in name for term in args.only):
+            continue
+        if not urls:
+            print(f"{name:<34} skipped (no data)")
+            continue
+        if name == "thumbnails cold":
+            await clear_thumbnails(client, database)
+        summary = await run_workload(client, urls, args.concurrency)
+        results.append({"name": name, **summary})
+        print(f"{name:<34} p50 {summary['p50_ms']:>8.1f}  p95 {summary['p95_ms']:>8.1f}  p99 {summary['p99_ms']:>8.1f} ms"
+              f"  {summary['throughput_rps']:>8.1f} req/s  {summary['errors']} errors")
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "target": args.base_url or "in-process",
+        "database": {
+            "alerts": await database[settings.ALERTS_COLLECTION_NAME].estimated_document_count(),
+        },
+        "requests_per_workload": args.requests,
+        "concurrency": args.concurrency,
+        "workloads": results,
+    }
+
+def compare(results: dict, baseline: dict, baseline_path: str) -> None:
+    """Print the p95 change of every workload against an earlier run."""
+    before_by_name = {w["name"]: w for w in baseline["workloads"]}
+    print(f"\np95 vs {baseline_path} ({baseline.get('commit', 'unknown')}):")
+    for workload in results["workloads"]:
+        before = before_by_name.get(workload["name"])
+        if before and before["p95_ms"]:
+            change = (workload["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+            print(f"{workload['name']:<34} {before['p95_ms']:>8.1f} -> {workload['p95_ms']:>8.1f} ms ({change:+.0f}%)")
+
+async def benchmark_api(args):
+    """
+    Runs every workload against the API and writes p50/p95/p99 latency and
+    throughput per workload to a JSON file named after the current commit.
+    """
+    # Settings are read at import time, so point the app at the benchmark database first.
+    # Background prewarming and the result cache are off so each request does its real work.
+    os.environ["MONGO_URI"] = args.mongo_uri
+    os.environ["MONGO_DB"] = args.db
+    os.environ.setdefault("THUMBNAIL_PREWARM_INTERVAL_SECONDS", "0")
+    os.environ.setdefault("RESULT_CACHE_TTL_SECONDS", "0")
+    os.environ.setdefault("QUERY_PLAN_REPORT", "false")
+    os.environ.setdefault("IMAGE_CACHE_CLEAR_ENABLED", "true")
+
+    # Read the baseline first, in case the new results overwrite it
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    mongo = AsyncIOMotorClient(args.mongo_uri, serverSelectionTimeoutMS=5000)
+    database = mongo[args.db]
+    try:
+        if args.base_url:
+            async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+                results = await run_benchmarks(args, client, database)
+        else:
+            from api.main import app
+            transport = httpx.ASGITransport(app=app)
+            async with app.router.lifespan_context(app):
+                async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+                    results = await run_benchmarks(args, client, database)
+    finally:
+        mongo.close()
+
+    output = args.output or os.path.join("benchmark-results", f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+    if baseline:
+        compare(results, baseline, args.compare)
+
+if __name__ == "__main__":
+    # This block allows the script to be run directly
+    asyncio.run(benchmark_api(parse_args()))
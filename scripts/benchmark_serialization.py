@@ -0,0 +1,96 @@
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add the root of the project to the Python path
+# This allows the script to import modules from the `api` package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from api.core.fast_json import json_response
+from api.models.alert import AlertSchema
+from api.routers.alerts import ALERT_LIST_ADAPTER
+from api.routers.people import PERSON_SUMMARY_LIST_ADAPTER, PersonSummary
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ROW_COUNTS = (100, 1_000, 10_000)
+REPEATS = 5
+
+def make_alerts(n: int) -> list:
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "person_id": f"person-{i % 500}",
+            "time": now - timedelta(seconds=i),
+            "level": "alert",
+            "image_id": f"image-{i}",
+            "camera_id": f"CAM{i % 12:03d}",
+            "message": "Person detected at main entrance",
+        }
+        for i in range(n)
+    ]
+
+def make_people(n: int) -> list:
+    now = datetime.utcnow()
+    return [
+        {
+            "person_id": f"person-{i}",
+            "alert_count": 40,
+            "first_seen": now - timedelta(days=30),
+            "last_seen": now,
+            "image_count": 40,
+            "image_ids": [f"image-{i}-{j}" for j in range(20)],
+            "sample_image_id": f"image-{i}-0",
+        }
+        for i in range(n)
+    ]
+
+def per_row(model, rows: list) -> bytes:
+    """The old path: a model per row, then jsonable_encoder and json.dumps."""
+    models = [model.model_validate(row) for row in rows]
+    return json.dumps(jsonable_encoder([m.model_dump(by_alias=True) for m in models])).encode()
+
+def best_ms(fn) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+def benchmark_serialization():
+    """
+    Times the per-row and single-TypeAdapter serialization paths for alert and
+    people list responses, plus an orjson variant if orjson is installed.
+    """
+    cases = [
+        ("alerts", AlertSchema, ALERT_LIST_ADAPTER, make_alerts),
+        ("people", PersonSummary, PERSON_SUMMARY_LIST_ADAPTER, make_people),
+    ]
+    print(f"{'payload':<8} {'rows':>7} {'per-row ms':>11} {'adapter ms':>11} {'orjson ms':>10} {'speedup':>8}")
+    for name, model, adapter, make_rows in cases:
+        for n in ROW_COUNTS:
+            rows = make_rows(n)
+            # Both paths must produce the same document
+            assert json.loads(per_row(model, rows)) == json.loads(json_response(adapter, rows).body)
+
+            slow = best_ms(lambda: per_row(model, rows))
+            fast = best_ms(lambda: json_response(adapter, rows))
+            with_orjson = "-"
+            if orjson is not None:
+                ms = best_ms(lambda: orjson.dumps(adapter.dump_python(adapter.validate_python(rows), mode="json", by_alias=True)))
+                with_orjson = f"{ms:.1f}"
+            print(f"{name:<8} {n:>7} {slow:>11.1f} {fast:>11.1f} {with_orjson:>10} {slow / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    # This block allows the script to be run directly
+    benchmark_serialization()
@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+
+# Add the root of the project to the Python path
+# This allows the script to import modules from the `api` package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Measure rendering, not the local disk tier
+os.environ["IMAGE_DISK_CACHE_DIR"] = ""
+
+from bson import ObjectId
+from PIL import Image
+
+from api.core.config import settings
+from api.routers.images import stream_image_thumbnail_with_bucket
+from api.services import thumbnails
+from api.services.thumbnails import render_thumbnail
+
+BUCKET_NAME = "originals"
+THUMB_BUCKET_NAME = "originals_thumbnails"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure thumbnail throughput and where each render spends its time.")
+    parser.add_argument("corpus", nargs="*", default=["web/test_image.jpg"], help="JPEG/PNG files or directories of them")
+    parser.add_argument("--synthetic", type=int, default=8, help="Also generate this many camera-sized noise frames")
+    parser.add_argument("--synthetic-size", default="1920x1080", help="WIDTHxHEIGHT of the generated frames")
+    parser.add_argument("--images", type=int, default=200, help="Thumbnails rendered per run; the corpus is cycled")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--executor", choices=["thread", "process", "both"], default="both")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated database round trip added to every GridFS call")
+    parser.add_argument("--profile", action="store_true", help="Print the top functions by cumulative time for the first run")
+    return parser.parse_args()
+
+# --- In-memory GridFS stand-in ---
+
+class MemoryCollection:
+    """A `.files` collection holding documents in a list; only equality filters are supported."""
+    def __init__(self, database: "MemoryDatabase"):
+        self._database = database
+        self.docs = []
+
+    async def find_one(self, query: dict, projection=None):
+        await self._database.round_trip()
+        for doc in self.docs:
+            if all(_get(doc, key) == value for key, value in query.items()):
+                return doc
+        return None
+
+def _get(doc: dict, dotted: str):
+    for part in dotted.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+class MemoryGridOut:
+    def __init__(self, data: bytes, database: "MemoryDatabase"):
+        self._data = data
+        self._database = database
+
+    async def read(self) -> bytes:
+        started = time.perf_counter()
+        await self._database.round_trip()
+        self._database.record("download", time.perf_counter() - started)
+        return self._data
+
+class MemoryDatabase:
+    """
+    Just enough of a Motor database for the thumbnail pipeline: `.files`
+    collections and file bodies in dicts, with an optional sleep per call
+    to stand in for network round trips. Download and upload times are recorded.
+    """
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.collections = defaultdict(lambda: MemoryCollection(self))
+        self.blobs = {}
+        self.stage_times = defaultdict(list)
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        return self.collections[name]
+
+    async def round_trip(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        else:
+            await asyncio.sleep(0)
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.stage_times[stage].append(seconds)
+
+    def add_file(self, bucket_name: str, data: bytes, metadata: dict = None) -> ObjectId:
+        file_id = ObjectId()
+        self.collections[f"{bucket_name}.files"].docs.append(
+            {"_id": file_id, "length": len(data), "uploadDate": datetime.utcnow(), "metadata": metadata or {}}
+        )
+        self.blobs[(bucket_name, file_id)] = data
+        return file_id
+
+class MemoryGridFSBucket:
+    """The AsyncIOMotorGridFSBucket calls the thumbnail pipeline makes, over a MemoryDatabase."""
+    def __init__(self, database: MemoryDatabase, bucket_name: str):
+        self._database = database
+        self._bucket_name = bucket_name
+
+    async def download_to_stream(self, file_id, destination) -> None:
+        started = time.perf_counter()
+        await self._database.round_trip()
+        destination.write(self._database.blobs[(self._bucket_name, file_id)])
+        self._database.record("download", time.perf_counter() - started)
+
+    async def open_download_stream(self, file_id) -> MemoryGridOut:
+        return MemoryGridOut(self._database.blobs[(self._bucket_name, file_id)], self._database)
+
+    async def upload_from_stream(self, filename: str, source, metadata: dict = None) -> ObjectId:
+        started = time.perf_counter()
+        await self._database.round_trip()
+        file_id = self._database.add_file(self._bucket_name, source.read(), metadata)
+        self._database.record("upload", time.perf_counter() - started)
+        return file_id
+
+class MemorySession:
+    def __init__(self, database: MemoryDatabase):
+        self.db = database
+
+# --- Corpus ---
+
+def load_corpus(paths: list, synthetic: int, synthetic_size: str) -> list:
+    """Image bytes from the given files and directories, plus generated frames."""
+    images = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            names = [path]
+        for name in names:
+            with open(name, "rb") as f:
+                images.append(f.read())
+
+    width, height = (int(v) for v in synthetic_size.lower().split("x"))
+    rng = random.Random(42)
+    for _ in range(synthetic):
+        # Noise compresses about as badly as a real camera frame
+        frame = Image.effect_noise((width, height), 48).convert("RGB")
+        tint = Image.new("RGB", (width, height), (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        out = io.BytesIO()
+        Image.blend(frame, tint, 0.5).save(out, "JPEG", quality=85)
+        images.append(out.getvalue())
+    return images
+
+def summarize(values: list) -> str:
+    if not values:
+        return "n/a"
+    ordered = sorted(values)
+    p50 = ordered[len(ordered) // 2]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"mean {sum(values) / len(values) * 1000:7.2f}  p50 {p50 * 1000:7.2f}  p95 {p95 * 1000:7.2f} ms"
+
+# --- Benchmarks ---
+
+async def profile_stages(corpus: list, count: int, latency: float) -> None:
+    """
+    Run the pipeline's stages one image at a time on the event loop thread, so
+    each stage's time and Python allocations can be attributed.
+    Pillow's pixel buffers are allocated outside the Python allocator, so
+    tracemalloc sees the encoded bytes and Python objects but not decoded images.
+    """
+    database = MemoryDatabase(latency)
+    file_ids = [database.add_file(BUCKET_NAME, corpus[i % len(corpus)]) for i in range(count)]
+    bucket = MemoryGridFSBucket(database, BUCKET_NAME)
+    thumb_bucket = MemoryGridFSBucket(database, THUMB_BUCKET_NAME)
+    render_times = defaultdict(list)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for file_id in file_ids:
+        original = io.BytesIO()
+        await bucket.download_to_stream(file_id, original)
+        timings = {}
+        thumb = render_thumbnail(original.getvalue(), timings=timings)
+        for stage, seconds in timings.items():
+            render_times[stage].append(seconds)
+        await thumb_bucket.upload_from_stream(f"thumb_{file_id}.jpg", io.BytesIO(thumb), metadata={"original_id": file_id})
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"\nPer-stage time over {count} images:")
+    for stage in ("download", "decode", "resize", "encode", "upload"):
+        values = database.stage_times.get(stage) or render_times.get(stage)
+        print(f"  {stage:<9} {summarize(values)}")
+    print(f"\nPython allocations: peak {peak / 1024:.0f} KiB traced; largest growth by line:")
+    for stat in after.compare_to(before, "lineno")[:8]:
+        print(f"  {stat}")
+
+async def run_pipeline(corpus: list, count: int, latency: float, concurrency: int) -> float:
+    """Render `count` uncached thumbnails through the endpoint helper. Returns images/sec."""
+    database = MemoryDatabase(latency)
+    session = MemorySession(database)
+    file_ids = [str(database.add_file(BUCKET_NAME, corpus[i % len(corpus)])) for i in range(count)]
+    thumbnails.thumbnail_cache.clear()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(file_id: str) -> None:
+        async with semaphore:
+            await stream_image_thumbnail_with_bucket(file_id, BUCKET_NAME, session, thumb_bucket_name=THUMB_BUCKET_NAME)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(file_id) for file_id in file_ids))
+    return count / (time.perf_counter() - started)
+
+async def benchmark_thumbnails(args):
+    """
+    Profiles the thumbnail pipeline stage by stage, then measures how many
+    thumbnails per second `stream_image_thumbnail_with_bucket` produces with
+    thread and process pools of each size, against an in-memory GridFS.
+    """
+    corpus = load_corpus(args.corpus, args.synthetic, args.synthetic_size)
+    if not corpus:
+        sys.exit("No images in the corpus.")
+    latency = args.latency_ms / 1000
+    print(f"Corpus: {len(corpus)} image(s), {sum(map(len, corpus)) / len(corpus) / 1024:.0f} KiB on average; "
+          f"simulated round trip {args.latency_ms:g} ms")
+
+    # The pipeline constructs Motor buckets itself; point it at the stand-in
+    thumbnails.AsyncIOMotorGridFSBucket = MemoryGridFSBucket
+
+    await profile_stages(corpus, min(args.images, 50), latency)
+
+    kinds = ["thread", "process"] if args.executor == "both" else [args.executor]
+    print(f"\nThroughput, {args.images} uncached thumbnails per run (2 requests in flight per worker):")
+    profiler = cProfile.Profile() if args.profile else None
+    for kind in kinds:
+        for workers in args.pool_sizes:
+            thumbnails.shutdown_executor()
+            settings.THUMBNAIL_EXECUTOR = kind
+            settings.THUMBNAIL_WORKERS = workers
+            # Start the workers before timing, so process start-up isn't counted
+            await asyncio.gather(*(thumbnails.render_in_pool(corpus[0]) for _ in range(workers)))
+            if profiler is not None:
+                profiler.enable()
+            rate = await run_pipeline(corpus, args.images, latency, concurrency=workers * 2)
+            if profiler is not None:
+                profiler.disable()
+                pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+                profiler = None
+            print(f"  {kind:<7} pool of {workers:>2}: {rate:8.1f} images/s")
+    thumbnails.shutdown_executor()
+
+if __name__ == "__main__":
+    # This block allows the script to be run directly
+    asyncio.run(benchmark_thumbnails(parse_args()))
@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+
+# Add the root of the project to the Python path
+# This allows the script to import modules from the `api` package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.db.mongodb import db
+from api.db.mongodb_utils import connect_to_mongo, close_mongo_connection
+from api.routers.alerts import build_alert_query
+from api.services import arrow_export
+from api.services.arrow_export import alert_arrow_schema, iter_alert_record_batches, with_date_column
+
+# Oldest first, so day partitions fill in order
+EXPORT_SORT = [("time", 1), ("_id", 1)]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export alerts to Parquet (partitioned by day and camera) or an Arrow IPC stream file.")
+    parser.add_argument("output", help="Output directory for parquet, or file path for arrow")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Rows per cursor batch and record batch")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of alerts to export")
+    parser.add_argument("--start-time", type=datetime.fromisoformat, default=None, help="ISO start of time range")
+    parser.add_argument("--end-time", type=datetime.fromisoformat, default=None, help="ISO end of time range")
+    parser.add_argument("--level", default=None)
+    parser.add_argument("--camera-id", default=None)
+    parser.add_argument("--person-id", default=None)
+    return parser.parse_args()
+
+async def write_arrow_file(batches, path: str) -> int:
+    """Write record batches to an Arrow IPC stream file. Returns the row count."""
+    pa = arrow_export.pa
+    rows = 0
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_stream(sink, alert_arrow_schema()) as writer:
+        async for batch in batches:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+async def write_parquet_dataset(batches, directory: str) -> int:
+    """
+    Write record batches to a hive-partitioned Parquet dataset
+    (`date=YYYY-MM-DD/camera_id=...`). The writer runs in a thread fed through a
+    small queue, so only a couple of batches are ever held in memory.
+    Returns the row count.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    pending: queue.Queue = queue.Queue(maxsize=2)
+    writer_done = threading.Event()
+    schema = alert_arrow_schema().append(pa.field("date", pa.date32()))
+
+    def queued_batches():
+        while True:
+            batch = pending.get()
+            if batch is None:
+                return
+            yield batch
+
+    def write():
+        try:
+            ds.write_dataset(
+                queued_batches(), directory, schema=schema, format="parquet",
+                partitioning=["date", "camera_id"], partitioning_flavor="hive",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+        finally:
+            writer_done.set()
+
+    def put(item) -> None:
+        # Stop waiting if the writer died; its exception surfaces below
+        while not writer_done.is_set():
+            try:
+                pending.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    loop = asyncio.get_running_loop()
+    writer = loop.run_in_executor(None, write)
+    rows = 0
+    try:
+        async for batch in batches:
+            await loop.run_in_executor(None, put, with_date_column(batch))
+            rows += batch.num_rows
+    finally:
+        await loop.run_in_executor(None, put, None)
+        await writer
+    return rows
+
+async def export_alerts_arrow(args):
+    """
+    Streams alerts matching the `/alerts` filters out of MongoDB into Arrow
+    record batches and writes them as Parquet or an Arrow IPC stream.
+    """
+    arrow_export.require_pyarrow()
+    await connect_to_mongo()
+    try:
+        query = build_alert_query(args.start_time, args.end_time, args.level, args.camera_id, args.person_id)
+        batches = iter_alert_record_batches(db.alerts_collection, query, EXPORT_SORT, args.batch_size, args.limit)
+
+        print(f"Exporting alerts to {args.output} ({args.format})...")
+        started = time.perf_counter()
+        if args.format == "arrow":
+            rows = await write_arrow_file(batches, args.output)
+        else:
+            rows = await write_parquet_dataset(batches, args.output)
+        elapsed = time.perf_counter() - started
+        print(f"Exported {rows} alerts in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.0f} rows/s)")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    # This block allows the script to be run directly
+    asyncio.run(export_alerts_arrow(parse_args()))
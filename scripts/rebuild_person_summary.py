@@ -0,0 +1,28 @@
+import asyncio
+import os
+import sys
+
+# Add the root of the project to the Python path
+# This allows the script to import modules from the `api` package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.db.mongodb_utils import connect_to_mongo, close_mongo_connection
+from api.services.person_summary import person_summary_view
+
+async def rebuild_person_summary():
+    """
+    Recomputes the person_summary collection from the full alerts collection
+    and resets its checkpoint. Run after backfilling or deleting alerts.
+    """
+    await connect_to_mongo()
+    try:
+        print("Rebuilding person summaries...")
+        high_water = await person_summary_view.rebuild()
+        count = await person_summary_view.collection.count_documents({})
+        print(f"Rebuilt {count} person summaries up to alert {high_water}")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    # This block allows the script to be run directly
+    asyncio.run(rebuild_person_summary())
@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import io
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add the root of the project to the Python path
+# This allows the script to import modules from the `api` package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from PIL import Image
+
+from api.core.config import settings
+from api.services.person_summary import STATE_COLLECTION_NAME
+
+LEVELS = ["info", "info", "info", "warning", "warning", "alert", "high", "medium", "low", "alert multiple"]
+MESSAGES = [
+    "Person detected at main entrance",
+    "Unknown person near loading dock",
+    "Person detected in restricted area",
+    "Repeated sighting in parking lot",
+]
+INSERT_BATCH = 10_000
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fill a local MongoDB with synthetic alerts and GridFS images for benchmarking.")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017", help="Benchmark MongoDB (never point this at production)")
+    parser.add_argument("--db", default="dfip_benchmark", help="Database to seed; its alerts and image buckets are replaced")
+    parser.add_argument("--alerts", type=int, default=1_000_000, help="Number of alert documents")
+    parser.add_argument("--images", type=int, default=500, help="Number of GridFS images; alerts cycle through them")
+    parser.add_argument("--people", type=int, default=5_000)
+    parser.add_argument("--cameras", type=int, default=24)
+    parser.add_argument("--days", type=int, default=30, help="Alerts are spread over this many past days")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, so runs are comparable")
+    return parser.parse_args()
+
+def make_image(rng: random.Random, size=(1280, 720)) -> bytes:
+    """A noisy, tinted frame that compresses about as badly as a camera still."""
+    img = Image.effect_noise(size, 48).convert("RGB")
+    tint = Image.new("RGB", size, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    out = io.BytesIO()
+    Image.blend(img, tint, 0.5).save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+async def seed_images(database, count: int, rng: random.Random) -> list:
+    """Upload `count` images to the originals bucket and return their image_ids."""
+    bucket_name = settings.GRIDFS_BUCKET_NAME
+    for name in (bucket_name, f"{bucket_name}_thumbnails"):
+        await database[f"{name}.files"].drop()
+        await database[f"{name}.chunks"].drop()
+
+    bucket = AsyncIOMotorGridFSBucket(database, bucket_name=bucket_name)
+    image_ids = []
+    for i in range(count):
+        image_id = f"img-{i:07d}"
+        await bucket.upload_from_stream(
+            f"{image_id}.jpg",
+            io.BytesIO(make_image(rng)),
+            metadata={"image_id": image_id, "contentType": "image/jpeg"},
+        )
+        image_ids.append(image_id)
+    return image_ids
+
+async def seed_alerts(collection, count: int, image_ids: list, people: int, cameras: int, days: int, rng: random.Random) -> None:
+    """Insert `count` alerts with skewed person and camera popularity, in time order."""
+    await collection.drop()
+    end = datetime.utcnow()
+    start = end - timedelta(days=days)
+    step = (end - start) / max(count, 1)
+    person_ids = [f"person-{i:06d}" for i in range(people)]
+    camera_ids = [f"CAM{i:03d}" for i in range(cameras)]
+
+    batch = []
+    for i in range(count):
+        batch.append({
+            # A few people and cameras account for most sightings
+            "person_id": person_ids[min(int(rng.paretovariate(1.2)) - 1, people - 1)] if rng.random() < 0.7 else rng.choice(person_ids),
+            "time": start + step * i,
+            "level": rng.choice(LEVELS),
+            "image_id": image_ids[i % len(image_ids)] if image_ids else None,
+            "camera_id": camera_ids[min(int(rng.paretovariate(1.5)) - 1, cameras - 1)],
+            "message": rng.choice(MESSAGES),
+        })
+        if len(batch) >= INSERT_BATCH:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+
+async def seed_benchmark_data(args):
+    """
+    Replaces the alerts collection and image buckets of the benchmark database
+    with synthetic data. Derived collections (person summaries, thumbnails) are
+    dropped so the API rebuilds them.
+    """
+    rng = random.Random(args.seed)
+    client = AsyncIOMotorClient(args.mongo_uri, serverSelectionTimeoutMS=5000)
+    try:
+        database = client[args.db]
+        started = time.perf_counter()
+
+        print(f"Uploading {args.images} images...")
+        image_ids = await seed_images(database, args.images, rng)
+
+        print(f"Inserting {args.alerts} alerts...")
+        await seed_alerts(database[settings.ALERTS_COLLECTION_NAME], args.alerts, image_ids,
+                          args.people, args.cameras, args.days, rng)
+
+        await database[settings.PERSON_SUMMARY_COLLECTION_NAME].drop()
+        await database[STATE_COLLECTION_NAME].drop()
+        print(f"Seeded {args.db} in {time.perf_counter() - started:.1f}s")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    # This block allows the script to be run directly
+    asyncio.run(seed_benchmark_data(parse_args()))
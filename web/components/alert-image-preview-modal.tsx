@@ -3,7 +3,7 @@
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from "@/components/ui/dialog";
 import { Badge } from "@/components/ui/badge";
 import { Icon } from "@/components/ui/icon";
-import { getImageThumbnailUrl } from "@/lib/api-client";
+import { getImagePreviewUrl } from "@/lib/api-client";
 import { 
   Loader2, 
   Calendar, 
@@ -92,7 +92,7 @@ export function AlertImagePreviewModal({
                 </h3>
                 <div className="relative flex-1 bg-black/5 rounded-lg overflow-hidden min-h-[300px]">
                   <Image
-                    src={getImageThumbnailUrl(imageId)}
+                    src={getImagePreviewUrl(imageId)}
                     alt={`Alert image ${imageId}`}
                     fill
                     className="object-contain"
@@ -4,7 +4,7 @@ import { useGetImageMetadata } from "@/hooks/use-api";
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from "@/components/ui/dialog";
 import { Loader2 } from "lucide-react";
 import { Icon } from "@/components/ui/icon";
-import { getImageThumbnailUrl } from "@/lib/api-client";
+import { getImagePreviewUrl } from "@/lib/api-client";
 import Image from "next/image";
 
 interface ImagePreviewModalProps {
@@ -28,7 +28,7 @@ export function ImagePreviewModal({ imageId, isOpen, onOpenChange }: ImagePrevie
           {imageMetadata && (
             <div className="relative h-full w-full">
                 <Image
-                    src={getImageThumbnailUrl(imageId!)}
+                    src={getImagePreviewUrl(imageId!)}
                     alt={`Alert image ${imageId}`}
                     fill
                     style={{ objectFit: "contain" }}
@@ -57,7 +57,7 @@ export function PersonCard({ person, onClick }: PersonCardProps) {
               </div>
               <div className="flex items-center space-x-1">
                 <Icon icon={Camera} className="w-3 h-3" />
-                <span>{person.imageIds.length}</span>
+                <span>{person.imageCount}</span>
               </div>
             </div>
 
@@ -6,7 +6,7 @@ import { Loader2, Camera, AlertTriangle, User, Clock, MapPin } from "lucide-reac
 import { Icon } from "@/components/ui/icon";
 import { useGetImageMetadata, PersonImage } from "@/hooks/use-api";
 import { formatDateTime } from "@/lib/date-utils";
-import { getImageThumbnailUrl } from "@/lib/api-client";
+import { getImagePreviewUrl } from "@/lib/api-client";
 import { useRouter } from "next/navigation";
 import Image from "next/image";
 
@@ -58,7 +58,7 @@ export function PersonImagePreviewModal({ image, personId, isOpen, onOpenChange
               <div className="space-y-4">
                 <div className="relative aspect-square bg-white/5 rounded-lg overflow-hidden">
                   <Image
-                    src={getImageThumbnailUrl(image.imageId)}
+                    src={getImagePreviewUrl(image.imageId)}
                     alt={`Alert image from ${image.cameraId}`}
                     fill
                     style={{ objectFit: "contain" }}
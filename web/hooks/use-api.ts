@@ -267,6 +267,7 @@ export type PersonSummary = {
   alertCount: number;
   firstSeen: string;
   lastSeen: string;
+  imageCount: number;
   imageIds: string[];
   sampleImageId: string | null;
 };
@@ -299,6 +300,10 @@ const normalizePerson = (person: any): PersonSummary => {
       (record["lastSeen"] as string | undefined) ??
       (record["last_seen"] as string | undefined) ??
       "",
+    imageCount:
+      (record["imageCount"] as number | undefined) ??
+      (record["image_count"] as number | undefined) ??
+      0,
     imageIds:
       (record["imageIds"] as string[] | undefined) ??
       (record["image_ids"] as string[] | undefined) ??
@@ -335,8 +340,17 @@ const normalizePersonImage = (image: any): PersonImage => {
 };
 
 const fetchPeople = async (): Promise<PersonSummary[]> => {
-  const { data } = await api.get<any[]>("/api/v1/people");
-  return data.map(normalizePerson);
+  // The API pages people; follow the cursor so the page can search all of them
+  const people: PersonSummary[] = [];
+  let cursor: string | undefined;
+  do {
+    const params = new URLSearchParams({ page_size: "500", image_ids_limit: "0" });
+    if (cursor) params.append("cursor", cursor);
+    const response = await api.get<any[]>("/api/v1/people?" + params.toString());
+    people.push(...response.data.map(normalizePerson));
+    cursor = response.headers["x-next-cursor"];
+  } while (cursor);
+  return people;
 };
 
 const fetchPersonImages = async (personId: string): Promise<PersonImage[]> => {
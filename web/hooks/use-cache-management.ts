@@ -1,42 +1,25 @@
 "use client";
 
-import { useQuery, useQueryClient } from "@tanstack/react-query";
+import { useQueryClient } from "@tanstack/react-query";
 import { useEffect, useState } from "react";
 
+import { getAlertStreamUrl } from "@/lib/api-client";
+
 /**
- * Hook that checks if there's new data available by comparing current time
- * with last successful query time for critical data
+ * Hook that flags new data as soon as the live alert stream delivers an alert,
+ * or tells us it skipped some and the cached data should be refetched
  */
 export function useNewDataAvailable() {
-  const queryClient = useQueryClient();
   const [hasNewData, setHasNewData] = useState(false);
-  
-  // Check for new data every 5 minutes
-  useQuery({
-    queryKey: ["newDataCheck"],
-    queryFn: async () => {
-      const now = Date.now();
-      const criticalQueries = ["stats", "alerts", "people", "cameras"];
-      
-      for (const queryKey of criticalQueries) {
-        const queryState = queryClient.getQueryState([queryKey]);
-        if (queryState?.dataUpdatedAt) {
-          // If data is older than 10 minutes, consider it stale
-          const dataAge = now - queryState.dataUpdatedAt;
-          if (dataAge > 10 * 60 * 1000) { // 10 minutes
-            setHasNewData(true);
-            return true;
-          }
-        }
-      }
-      
-      setHasNewData(false);
-      return false;
-    },
-    refetchInterval: 5 * 60 * 1000, // Check every 5 minutes
-    refetchIntervalInBackground: true,
-    staleTime: 0, // Always consider this query stale
-  });
+
+  // EventSource reconnects on its own and resumes from the last alert it saw
+  useEffect(() => {
+    const source = new EventSource(getAlertStreamUrl());
+    const flag = () => setHasNewData(true);
+    source.addEventListener("alert", flag);
+    source.addEventListener("reset", flag);
+    return () => source.close();
+  }, []);
 
   const markDataAsViewed = () => {
     setHasNewData(false);
@@ -42,3 +42,13 @@ export default api;
 export const getImageThumbnailUrl = (imageId: string) => {
   return `${getApiUrl()}/api/v1/images/by-image-id/${imageId}/thumbnail`;
 };
+
+// Resized copy of an image for previews; the API picks AVIF/WebP/JPEG from the Accept header
+export const getImagePreviewUrl = (imageId: string, size: number = 1280) => {
+  return `${getApiUrl()}/api/v1/images/by-image-id/${imageId}/derivative?size=${size}`;
+};
+
+// URL of the live alert feed (Server-Sent Events)
+export const getAlertStreamUrl = () => {
+  return `${getApiUrl()}/api/v1/alerts/stream`;
+};